@@ -0,0 +1,198 @@
+"""
+Tasks, subflows and CLI dispatch shared by the worker-flow scripts.
+
+The scripts (and Prefect, when it loads a deployment's entrypoint) put this
+directory on sys.path, so they can `from _common import ...`. Python caches
+the import, so these tasks and flows are defined once per process no matter
+how many flow scripts a worker loads.
+"""
+
+import asyncio
+import os
+import sys
+from typing import Any, Awaitable, Callable, Dict, Optional
+from uuid import UUID
+
+from prefect import Flow, Task, task, flow, get_run_logger
+from prefect.client.orchestration import PrefectClient
+from prefect.client.schemas.objects import FlowRun
+from prefect.context import FlowRunContext
+from prefect.engine import _dynamic_key_for_task_run
+from prefect.states import Pending
+from prefect.task_runners import ConcurrentTaskRunner
+from prefect.utilities.slugify import slugify
+
+from _env import get_prefect_env, print_banner, run_async
+
+
+@flow(
+    name="process-table-etl",
+    flow_run_name="process-table-etl-{table}",
+    log_prints=True,
+    task_runner=ConcurrentTaskRunner(),
+)
+async def process_table_etl(table: int):
+    """
+    Subflow that processes a single table.
+    This will be executed by workers from the work pool; the run name
+    (process-table-etl-<table>) identifies the table in the UI and logs.
+    """
+    # Call the actual ETL task
+    result = await sql_query(table)
+
+    # Success is already recorded in the run's state; only the table is returned
+    return result["table"]
+
+
+@task(
+    name="sql-query-task",
+    task_run_name="sql-query-table-{table}",
+    log_prints=True,
+    tags=["database"],
+    # Exponential backoff with jitter so retries of many tables rejected by the
+    # "database" concurrency limit don't all come back at the same moment
+    retries=3,
+    retry_delay_seconds=[2, 8, 32],
+    retry_jitter_factor=0.5,
+)
+async def sql_query(table):
+    logger = get_run_logger()
+    logger.info(f"Running SQL query for table {table}...")
+    # Stands in for the query; use an async driver, or asyncio.to_thread()
+    # around a blocking one, so the worker's event loop stays free
+    await asyncio.sleep(30)
+    logger.info(f"SQL query completed for table {table}")
+    return {"table": table, "status": "success"}
+
+
+@flow(
+    name="cleanup-flow-1",
+    log_prints=True,
+    persist_result=False,
+    task_runner=ConcurrentTaskRunner(),
+)
+async def cleanup_flow1():
+    """
+    Cleanup subflow - will be executed by workers from work pool.
+    """
+    logger = get_run_logger()
+    logger.info("Cleaning up resources...")
+    result = await cleanup_task1()
+    logger.info("Cleanup flow 1 done.")
+    return result
+
+
+@flow(
+    name="cleanup-flow-2",
+    log_prints=True,
+    persist_result=False,
+    task_runner=ConcurrentTaskRunner(),
+)
+async def cleanup_flow2():
+    """
+    Cleanup subflow - will be executed by workers from work pool.
+    """
+    logger = get_run_logger()
+    logger.info("Finalizing cleanup...")
+    result = await cleanup_task2()
+    logger.info("Cleanup flow 2 finalized.")
+    return result
+
+
+@task(name="cleanup-task-1", log_prints=True, persist_result=False)
+async def cleanup_task1():
+    logger = get_run_logger()
+    logger.info("Executing cleanup task 1...")
+    await asyncio.sleep(5)
+    logger.info("Cleanup task 1 done.")
+    return {"status": "cleanup1_complete"}
+
+
+@task(name="cleanup-task-2", log_prints=True, persist_result=False)
+async def cleanup_task2():
+    logger = get_run_logger()
+    logger.info("Executing cleanup task 2...")
+    await asyncio.sleep(5)
+    logger.info("Cleanup task 2 finalized.")
+    return {"status": "cleanup2_complete"}
+
+
+async def create_subflow_run(
+    client: PrefectClient,
+    deployment_id: UUID,
+    deployment_path: str,
+    parameters: Optional[Dict[str, Any]] = None,
+) -> FlowRun:
+    """
+    Create a flow run of a deployment as a subflow of the current flow run.
+
+    Like run_deployment(), this first records a placeholder task run in the
+    calling flow run and passes its ID as parent_task_run_id, so the new run
+    is shown under its parent in the UI and is cancelled along with it.
+    Outside a flow run, the run is created without a parent.
+
+    Args:
+        client: Open Prefect client
+        deployment_id: ID of the deployment to run
+        deployment_path: Full path to deployment, naming the placeholder task
+        parameters: Optional parameters to pass to the subflow
+
+    Returns:
+        The created flow run
+    """
+    parent_task_run_id = None
+    flow_run_ctx = FlowRunContext.get()
+    if flow_run_ctx is not None:
+        # No-op task standing in for the subflow among the parent's task runs
+        parent_task = Task(name=deployment_path, fn=lambda: None)
+        parent_task.task_key = (
+            f"{__name__}.create_subflow_run.{slugify(deployment_path)}"
+        )
+        parent_task_run = await client.create_task_run(
+            task=parent_task,
+            flow_run_id=flow_run_ctx.flow_run.id,
+            dynamic_key=_dynamic_key_for_task_run(flow_run_ctx, parent_task),
+            state=Pending(),
+        )
+        parent_task_run_id = parent_task_run.id
+
+    return await client.create_flow_run_from_deployment(
+        deployment_id,
+        parameters=parameters or {},
+        parent_task_run_id=parent_task_run_id,
+    )
+
+
+def run_cli(
+    main_flow: Flow,
+    deploy_all_flows: Callable[[str], Awaitable[None]],
+    script: str,
+) -> None:
+    """
+    Print the banner and dispatch the `deploy` / `run` command from sys.argv.
+
+    Args:
+        main_flow: Orchestrator flow started by `run`
+        deploy_all_flows: Coroutine function deploying every flow to a work pool
+        script: Path of the calling script (its __file__)
+    """
+    env = get_prefect_env()
+    print_banner(env, f"flows/{os.path.basename(script)}")
+
+    if len(sys.argv) > 1:
+        command = sys.argv[1]
+
+        if command == "deploy":
+            asyncio.run(deploy_all_flows(env.work_pool))
+
+        elif command == "run":
+            # Run the main flow directly (for testing)
+            print("\n▶️  Running main ETL flow...")
+            print("⚠️  Make sure workers are running!")
+            run_async(main_flow())
+
+        else:
+            print(f"\n❌ Unknown command: {command}")
+            print("   Use: deploy, run")
+    else:
+        print("\n⚠️  No command specified. Use: deploy, run")
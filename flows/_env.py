@@ -0,0 +1,104 @@
+"""
+Shared environment settings, CLI banner and event-loop runner for the
+worker-flow scripts.
+
+The scripts run as `python flows/<script>.py`, which puts this directory on
+sys.path, so they (and `_common`) can `from _env import ...`.
+"""
+
+import asyncio
+import functools
+import os
+import sys
+from dataclasses import dataclass
+from typing import Any, Coroutine, Optional
+
+
+@dataclass(frozen=True)
+class PrefectEnv:
+    """Prefect connection settings read from the environment."""
+
+    api_url: str
+    api_key: Optional[str]
+    work_pool: str
+
+
+@functools.cache
+def get_prefect_env() -> PrefectEnv:
+    """Read the Prefect settings from the environment (once per process)."""
+    return PrefectEnv(
+        api_url=os.getenv("PREFECT_API_URL", "http://localhost:4200/api"),
+        api_key=os.getenv("PREFECT_API_KEY"),
+        work_pool=os.getenv("PREFECT_WORK_POOL", "default-pool"),
+    )
+
+
+@functools.cache
+def render_banner(env: PrefectEnv, script: str) -> str:
+    """
+    Build the startup banner with deployment instructions.
+
+    Args:
+        env: Prefect settings to show
+        script: Path of the script, as used in the printed commands
+
+    Returns:
+        The full banner, ready to print in one call
+    """
+    if env.api_key:
+        auth_line = f"🔐 Using API Key: {env.api_key[:8]}..."
+    else:
+        auth_line = "⚠️  No API key (development mode)"
+
+    lines = [
+        "=" * 70,
+        "PREFECT DISTRIBUTED ETL FLOW (Work Pool)",
+        "=" * 70,
+        f"🔗 Prefect Server: {env.api_url}",
+        f"🏊 Work Pool: {env.work_pool}",
+        auth_line,
+        "=" * 70,
+        "\n📋 DEPLOYMENT INSTRUCTIONS:",
+        "-" * 70,
+        "This flow uses work pools for distributed execution.",
+        "Follow these steps:",
+        "",
+        "1. Deploy all flows to work pool:",
+        f"   python {script} deploy",
+        "",
+        "2. Start workers to process flows:",
+        f"   prefect worker start --pool {env.work_pool}",
+        "",
+        "3. Run the main orchestrator flow:",
+        f"   python {script} run",
+        "",
+        "Or use the deployment from UI:",
+        f"   - Visit: {env.api_url.replace('/api', '')}",
+        "   - Navigate to Deployments",
+        "   - Find 'main-etl-job' and click 'Run'",
+        "=" * 70,
+    ]
+    return "\n".join(lines)
+
+
+def print_banner(env: PrefectEnv, script: str) -> None:
+    """Write the banner to stdout in a single write, rather than line by line."""
+    sys.stdout.write(render_banner(env, script) + "\n")
+    sys.stdout.flush()
+
+
+def run_async(main: Coroutine[Any, Any, Any]) -> Any:
+    """
+    Run a coroutine like asyncio.run(), on uvloop's event loop when available.
+
+    uvloop has lower per-callback overhead than the stock loop, which helps the
+    orchestrators' wide gathers and polling loops. It isn't available on
+    Windows, so fall back to the default loop when it can't be imported.
+    """
+    try:
+        import uvloop
+    except ImportError:
+        return asyncio.run(main)
+
+    asyncio.set_event_loop_policy(uvloop.EventLoopPolicy())
+    return asyncio.run(main)
@@ -1,13 +1,30 @@
-import time
 import os
-from typing import List, Dict, Any
+import random
+from typing import List, Dict, Any, Iterable, Optional, Set, Tuple
 from dataclasses import dataclass
-from prefect import task, flow, get_run_logger
-from prefect.deployments import run_deployment, Deployment
-from prefect.client.orchestration import get_client
-from prefect.client.schemas.filters import FlowRunFilter
-from prefect.client.schemas.objects import StateType
+from prefect import Flow, task, flow, get_run_logger
+from prefect.deployments import Deployment
+from prefect.task_runners import ConcurrentTaskRunner
+from prefect.client.orchestration import PrefectClient, get_client
+from prefect.client.schemas.filters import (
+    FlowRunFilter,
+    FlowRunFilterId,
+    FlowRunFilterState,
+    FlowRunFilterStateType,
+)
+from prefect.client.schemas.objects import FlowRun, StateType
+from prefect.exceptions import ObjectNotFound
 import asyncio
+from uuid import UUID
+
+from _common import (
+    cleanup_flow1,
+    cleanup_flow2,
+    create_subflow_run,
+    process_table_etl,
+    run_cli,
+    sql_query,
+)
 
 
 # ============================================================================
@@ -15,59 +32,58 @@ import asyncio
 # ============================================================================
 
 
-@dataclass
-class DeploymentConfig:
-    """Configuration for a flow deployment."""
+@dataclass(slots=True, frozen=True)
+class DeploymentSpec:
+    """Static configuration for a flow deployment (linked to its flow in DEPLOYMENTS)."""
 
-    flow_func: Any
     deployment_name: str
     description: str
 
-    @property
-    def deployment_path(self) -> str:
-        """Get the full deployment path for run_deployment."""
-        flow_name = self.flow_func.__name__.replace("_", "-")
-        return f"{flow_name}/{self.deployment_name}"
 
-
-# Define all deployments in one place
-DEPLOYMENT_CONFIGS = [
-    DeploymentConfig(
-        flow_func=None,  # Will be set below after flow definitions
+# Define all deployments in one place, in the same order as the flows they
+# are linked to under "Deployment Management" below
+DEPLOYMENT_SPECS: Tuple[DeploymentSpec, ...] = (
+    DeploymentSpec(
         deployment_name="main-etl-deployment",
         description="Main ETL orchestrator that coordinates pre_etl, sub_etl, and final_etl",
     ),
-    DeploymentConfig(
-        flow_func=None,
+    DeploymentSpec(
         deployment_name="pre-etl-deployment",
         description="Pre-ETL flow that runs before main processing",
     ),
-    DeploymentConfig(
-        flow_func=None,
+    DeploymentSpec(
         deployment_name="sub-etl-deployment",
         description="Sub-ETL orchestrator that submits subflows to work pool",
     ),
-    DeploymentConfig(
-        flow_func=None,
+    DeploymentSpec(
         deployment_name="final-etl-deployment",
         description="Final ETL flow that runs after all processing completes",
     ),
-    DeploymentConfig(
-        flow_func=None,
+    DeploymentSpec(
         deployment_name="process-table-etl-deployment",
         description="ETL subflow for processing individual tables",
     ),
-    DeploymentConfig(
-        flow_func=None,
+    DeploymentSpec(
+        deployment_name="process-all-tables-deployment",
+        description="ETL subflow that processes every table as mapped tasks in one run",
+    ),
+    DeploymentSpec(
         deployment_name="cleanup-flow-1-deployment",
         description="Cleanup subflow 1",
     ),
-    DeploymentConfig(
-        flow_func=None,
+    DeploymentSpec(
         deployment_name="cleanup-flow-2-deployment",
         description="Cleanup subflow 2",
     ),
-]
+)
+
+
+# Work pool the deployments are applied to (and whose capacity sub_etl reads)
+WORK_POOL = os.getenv("PREFECT_WORK_POOL", "default-pool")
+
+# Cap on concurrent Prefect API calls (submissions and state reads) so a wide
+# fan-out doesn't flood the server; tune to its capacity via the env var.
+SUBMIT_SEM = asyncio.Semaphore(int(os.getenv("PREFECT_MAX_INFLIGHT", "8")))
 
 
 # ============================================================================
@@ -75,94 +91,319 @@ DEPLOYMENT_CONFIGS = [
 # ============================================================================
 
 
+# "flow-name/deployment-name" -> deployment ID, filled on first use
+_DEPLOYMENT_IDS: Dict[str, UUID] = {}
+
+
+async def resolve_deployment_id(client: PrefectClient, deployment_path: str) -> UUID:
+    """
+    Look up a deployment's ID by path, caching it for later submissions.
+
+    Args:
+        client: Open Prefect client
+        deployment_path: Full path to deployment (e.g., "process-table-etl/process-table-etl-deployment")
+
+    Returns:
+        Deployment ID
+    """
+    if deployment_path not in _DEPLOYMENT_IDS:
+        deployment = await client.read_deployment_by_name(deployment_path)
+        _DEPLOYMENT_IDS[deployment_path] = deployment.id
+    return _DEPLOYMENT_IDS[deployment_path]
+
+
 async def trigger_subflow(
-    deployment_path: str, parameters: Dict[str, Any] = None
-) -> str:
+    deployment_path: str,
+    parameters: Dict[str, Any] = None,
+    *,
+    client: PrefectClient,
+) -> UUID:
     """
     Trigger a deployed subflow and return its flow run ID.
 
+    Creates the run directly from the cached deployment ID, so only the
+    first submission per deployment pays for the name lookup. The run is
+    linked to the calling flow run as a subflow.
+
     Args:
         deployment_path: Full path to deployment (e.g., "process-table-etl/process-table-etl-deployment")
         parameters: Optional parameters to pass to the subflow
+        client: Open Prefect client
 
     Returns:
         Flow run ID
     """
     logger = get_run_logger()
 
-    flow_run = await run_deployment(
-        name=deployment_path,
-        parameters=parameters or {},
-        timeout=0,  # Don't wait, return immediately
-    )
+    async with SUBMIT_SEM:
+        deployment_id = await resolve_deployment_id(client, deployment_path)
+        flow_run = await create_subflow_run(
+            client, deployment_id, deployment_path, parameters
+        )
 
     logger.info(f"Triggered subflow {deployment_path} (run_id: {flow_run.id})")
     return flow_run.id
 
 
-async def trigger_multiple_subflows(
-    deployment_path: str, parameters_list: List[Dict[str, Any]]
-) -> List[str]:
+async def run_and_wait(
+    *deployment_paths: str,
+    parameters: Dict[str, Any] = None,
+    timeout: float = 3600,
+) -> List[FlowRun]:
     """
-    Trigger multiple instances of the same subflow with different parameters.
+    Trigger deployed subflows and wait for all of them to complete.
+
+    The runs are created concurrently and then polled together, one filtered
+    query per cycle for all of them (see wait_for_flow_runs), instead of
+    each run being polled on its own as run_deployment does.
 
     Args:
-        deployment_path: Full path to deployment
-        parameters_list: List of parameter dicts, one per subflow instance
+        deployment_paths: Full paths of the deployments to run
+        parameters: Optional parameters to pass to every subflow
+        timeout: Seconds to wait before giving up on the runs
 
     Returns:
-        List of flow run IDs
+        The finished flow runs, in the order of deployment_paths
+
+    Raises:
+        RuntimeError: If any run finished in a state other than Completed
+        asyncio.TimeoutError: If the runs are not all finished after `timeout`
     """
-    logger = get_run_logger()
-    logger.info(f"Triggering {len(parameters_list)} instances of {deployment_path}...")
+    async with get_client() as client:
+        run_ids = await asyncio.gather(
+            *(
+                trigger_subflow(path, parameters, client=client)
+                for path in deployment_paths
+            )
+        )
+        flow_runs = await asyncio.wait_for(
+            wait_for_flow_runs(run_ids, client=client), timeout
+        )
+
+    unsuccessful = [
+        f"{path} ({flow_run.state.name})"
+        for path, flow_run in zip(deployment_paths, flow_runs)
+        if not flow_run.state.is_completed()
+    ]
+    if unsuccessful:
+        raise RuntimeError(f"Subflows did not complete: {', '.join(unsuccessful)}")
+    return flow_runs
+
+
+# Terminal states a waited-on flow run can end up in
+FINAL_STATE_TYPES = [
+    StateType.COMPLETED,
+    StateType.FAILED,
+    StateType.CRASHED,
+    StateType.CANCELLED,
+]
 
-    flow_run_ids = []
-    for params in parameters_list:
-        run_id = await trigger_subflow(deployment_path, params)
-        flow_run_ids.append(run_id)
 
-    return flow_run_ids
+async def _read_finished_flow_runs(
+    client: PrefectClient, run_ids: Iterable[UUID]
+) -> List[FlowRun]:
+    """Read just the given flow runs that reached a final state, in one query."""
+    async with SUBMIT_SEM:
+        return await client.read_flow_runs(
+            flow_run_filter=FlowRunFilter(
+                id=FlowRunFilterId(any_=list(run_ids)),
+                state=FlowRunFilterState(
+                    type=FlowRunFilterStateType(any_=FINAL_STATE_TYPES)
+                ),
+            )
+        )
 
 
-async def wait_for_flow_runs(flow_run_ids: List[str]) -> None:
+def _log_finished_flow_runs(finished: List[FlowRun], remaining: int) -> None:
+    """Log one poll cycle's finished runs: failures individually, then a summary."""
+    if not finished:
+        return
+    logger = get_run_logger()
+    completed_ids = [fr.id for fr in finished if fr.state.is_completed()]
+
+    # Only unsuccessful runs get their own log line; successes are summarised
+    for flow_run in finished:
+        run_id, state = flow_run.id, flow_run.state
+        if state.is_failed():
+            logger.error(f"Flow run {run_id} failed: {state.message}")
+        elif state.is_crashed():
+            logger.error(f"Flow run {run_id} crashed: {state.message}")
+        elif state.is_cancelled():
+            logger.warning(f"Flow run {run_id} was cancelled")
+
+    logger.info(
+        f"Poll cycle: completed={len(completed_ids)} "
+        f"failed={len(finished) - len(completed_ids)} "
+        f"remaining={remaining} "
+        f"ids={[str(run_id)[:8] for run_id in completed_ids]}"
+    )
+
+
+async def wait_for_flow_runs(
+    flow_run_ids: List[UUID], client: PrefectClient
+) -> List[FlowRun]:
     """
-    Wait for all flow runs to complete.
-    Polls the Prefect API to check flow run states.
+    Wait for all flow runs to reach a final state.
+    Polls the Prefect API to check flow run states (self-hosted 2.13.7 servers
+    have no events websocket to subscribe to instead), with one filtered
+    query per cycle for every run still pending.
 
     Args:
         flow_run_ids: List of flow run IDs to wait for
+        client: Open Prefect client
+
+    Returns:
+        The finished flow runs, in the order of flow_run_ids
     """
     logger = get_run_logger()
+    # Normalise to UUIDs so they compare equal to the ids on returned runs
+    flow_run_ids = [UUID(str(run_id)) for run_id in flow_run_ids]
+    pending_ids = set(flow_run_ids)
+    finished_runs: Dict[UUID, FlowRun] = {}
+    delay = 1.0
+    max_delay = 15.0
+
+    while pending_ids:
+        # One filtered query per cycle returns just the pending runs that finished
+        finished = await _read_finished_flow_runs(client, pending_ids)
+        finished_runs.update((flow_run.id, flow_run) for flow_run in finished)
+        pending_ids -= {flow_run.id for flow_run in finished}
+        _log_finished_flow_runs(finished, remaining=len(pending_ids))
+
+        if pending_ids:
+            # Back off while nothing finishes; reset as soon as something does
+            delay = 1.0 if finished else min(delay * 2, max_delay)
+            await asyncio.sleep(delay + random.uniform(0, 0.25 * delay))
+
+    logger.info("All flow runs completed")
+    return [finished_runs[run_id] for run_id in flow_run_ids]
+
+
+async def read_pool_concurrency_limit(
+    client: PrefectClient, work_pool_name: str
+) -> Optional[int]:
+    """
+    Read a work pool's concurrency limit.
 
-    async with get_client() as client:
-        pending_ids = set(flow_run_ids)
-
-        while pending_ids:
-            # Check status of pending flow runs
-            for run_id in list(pending_ids):
-                flow_run = await client.read_flow_run(run_id)
+    Args:
+        client: Open Prefect client
+        work_pool_name: Name of the work pool
 
-                if flow_run.state.is_final():
-                    if flow_run.state.is_completed():
-                        logger.info(f"Flow run {run_id} completed successfully")
-                    elif flow_run.state.is_failed():
-                        logger.error(
-                            f"Flow run {run_id} failed: {flow_run.state.message}"
-                        )
-                    elif flow_run.state.is_crashed():
-                        logger.error(
-                            f"Flow run {run_id} crashed: {flow_run.state.message}"
-                        )
-                    elif flow_run.state.is_cancelled():
-                        logger.warning(f"Flow run {run_id} was cancelled")
+    Returns:
+        The pool's concurrency limit, or None if it is unlimited or the pool
+        can't be found
+    """
+    try:
+        pool = await client.read_work_pool(work_pool_name)
+    except ObjectNotFound:
+        get_run_logger().warning(f"Work pool {work_pool_name!r} not found")
+        return None
+    return pool.concurrency_limit
+
+
+async def stream_subflows(
+    deployment_path: str,
+    parameters_iter: Iterable[Dict[str, Any]],
+    client: PrefectClient,
+    maxsize: int = 32,
+    max_active: Optional[int] = None,
+) -> List[UUID]:
+    """
+    Submit subflows and wait for them with submission and completion overlapped.
 
-                    pending_ids.remove(run_id)
+    A producer submits runs as concurrent tasks (API calls bounded by
+    SUBMIT_SEM) and pushes each ID onto a bounded queue as it comes back. A
+    consumer keeps a single set of pending runs: each poll cycle it adds
+    whatever IDs were queued since the last one and checks all of them with
+    one filtered query, so early runs are tracked while later ones are still
+    being created. With max_active set, no more than that many runs are in
+    flight at once; the producer holds back until the consumer sees one finish.
+    If either side fails, the other is cancelled.
 
-            if pending_ids:
-                # Still have pending runs, wait before checking again
-                await asyncio.sleep(2)
+    Args:
+        deployment_path: Full path to deployment
+        parameters_iter: Parameter dicts, one per subflow instance
+        client: Open Prefect client shared by producer and consumer
+        maxsize: Maximum number of submitted IDs waiting to be picked up
+        max_active: Optional cap on unfinished runs (e.g. the work pool's
+            concurrency limit); unbounded if omitted
 
-        logger.info("All flow runs completed")
+    Returns:
+        List of flow run IDs, in submission order
+    """
+    queue: asyncio.Queue = asyncio.Queue(maxsize=maxsize)
+    active = asyncio.Semaphore(max_active) if max_active else None
+
+    async def submit(parameters: Dict[str, Any]) -> UUID:
+        run_id = await trigger_subflow(deployment_path, parameters, client=client)
+        await queue.put(run_id)
+        return run_id
+
+    async def producer() -> List[UUID]:
+        submissions: List[asyncio.Task] = []
+        try:
+            for parameters in parameters_iter:
+                if active is not None:
+                    await active.acquire()
+                submissions.append(asyncio.create_task(submit(parameters)))
+            run_ids = await asyncio.gather(*submissions)
+        finally:
+            # On failure, don't leave sibling submissions running
+            for submission in submissions:
+                submission.cancel()
+        await queue.put(None)  # Sentinel: nothing more to submit
+        return run_ids
+
+    async def consumer() -> None:
+        pending: Set[UUID] = set()
+        submitting = True
+        delay = 1.0
+        max_delay = 15.0
+        try:
+            while submitting or pending:
+                # Block for the next ID only when there is nothing to poll
+                queued = [] if pending else [await queue.get()]
+                while not queue.empty():
+                    queued.append(queue.get_nowait())
+                for run_id in queued:
+                    if run_id is None:
+                        submitting = False
+                    else:
+                        pending.add(UUID(str(run_id)))
+                if not pending:
+                    continue
+
+                # One filtered query per cycle for every pending run
+                finished = await _read_finished_flow_runs(client, pending)
+                finished_ids = {flow_run.id for flow_run in finished}
+                pending -= finished_ids
+                if active is not None:
+                    for _ in finished_ids:
+                        active.release()
+                _log_finished_flow_runs(finished, remaining=len(pending))
+
+                if pending:
+                    # Back off while nothing finishes; reset as soon as something does
+                    delay = 1.0 if finished else min(delay * 2, max_delay)
+                    await asyncio.sleep(delay + random.uniform(0, 0.25 * delay))
+        finally:
+            # Return the permits of runs still pending, so a producer waiting
+            # on acquire() is never left blocked behind a failed consumer
+            if active is not None:
+                for _ in pending:
+                    active.release()
+
+        get_run_logger().info("All flow runs completed")
+
+    tasks = [asyncio.create_task(producer()), asyncio.create_task(consumer())]
+    try:
+        run_ids, _ = await asyncio.gather(*tasks)
+    finally:
+        # If one side failed (or we were cancelled), don't leave the other running
+        for pending_task in tasks:
+            pending_task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+    return run_ids
 
 
 # ============================================================================
@@ -182,32 +423,34 @@ async def main_etl():
     # Phase 1: Run pre_etl and sub_etl in parallel
     logger.info("Phase 1: Starting pre_etl and sub_etl in parallel...")
 
-    pre_etl_run_id = await trigger_subflow("pre-etl-job/pre-etl-deployment")
-    sub_etl_run_id = await trigger_subflow("sub-etl-job/sub-etl-deployment")
-
-    # Wait for both to complete
-    await wait_for_flow_runs([pre_etl_run_id, sub_etl_run_id])
+    # Run both and wait for them to complete; if either doesn't, this flow fails
+    pre_etl_run, sub_etl_run = await run_and_wait(
+        DEPLOYMENT_PATHS["pre-etl-deployment"],
+        DEPLOYMENT_PATHS["sub-etl-deployment"],
+    )
     logger.info("Phase 1 completed: pre_etl and sub_etl finished")
 
     # Phase 2: Run final_etl after both pre_etl and sub_etl complete
     logger.info("Phase 2: Starting final_etl...")
-    final_etl_run_id = await trigger_subflow("final-etl-job/final-etl-deployment")
-
-    # Wait for final_etl to complete
-    await wait_for_flow_runs([final_etl_run_id])
+    (final_etl_run,) = await run_and_wait(DEPLOYMENT_PATHS["final-etl-deployment"])
     logger.info("Phase 2 completed: final_etl finished")
 
     logger.info("ETL flow completed successfully.")
     return {
-        "pre_etl_run_id": pre_etl_run_id,
-        "sub_etl_run_id": sub_etl_run_id,
-        "final_etl_run_id": final_etl_run_id,
+        "pre_etl_run_id": pre_etl_run.id,
+        "sub_etl_run_id": sub_etl_run.id,
+        "final_etl_run_id": final_etl_run.id,
         "status": "completed",
     }
 
 
-@flow(name="pre-etl-job", log_prints=True)
-def pre_etl():
+@flow(
+    name="pre-etl-job",
+    log_prints=True,
+    persist_result=False,
+    task_runner=ConcurrentTaskRunner(),
+)
+async def pre_etl():
     """
     Pre-ETL flow that runs before main processing.
     Performs setup, validation, or preparatory tasks.
@@ -216,51 +459,70 @@ def pre_etl():
     logger.info("Starting pre-ETL processing...")
 
     # Simulate pre-ETL work (e.g., data validation, setup)
-    result = pre_etl_task()
+    result = await pre_etl_task()
 
     logger.info("Pre-ETL processing completed.")
     return result
 
 
 @flow(name="sub-etl-job", log_prints=True)
-async def sub_etl():
+async def sub_etl(isolate_tables: bool = False):
     """
-    Sub-orchestrator that submits subflows to work pool for distributed execution.
-    Each subflow will be picked up by workers and run concurrently based on work pool capacity.
+    Sub-orchestrator that runs the table ETL on the work pool, then cleanup.
+
+    By default all 20 tables run as mapped tasks inside a single
+    process_all_tables flow run. Set isolate_tables=True to give each table
+    its own flow run instead, for tables that need separate retries or infra.
     """
     logger = get_run_logger()
     logger.info("Starting sub-ETL orchestration...")
 
-    # Submit all 20 ETL subflows to the work pool for distributed execution
-    parameters_list = [{"table": table} for table in range(20)]
-    flow_run_ids = await trigger_multiple_subflows(
-        deployment_path="process-table-etl/process-table-etl-deployment",
-        parameters_list=parameters_list,
-    )
-
-    # Wait for all ETL subflows to complete
-    logger.info(f"Waiting for all {len(flow_run_ids)} ETL subflows to complete...")
-    await wait_for_flow_runs(flow_run_ids)
-    logger.info(f"All {len(flow_run_ids)} ETL subflows completed successfully")
+    if isolate_tables:
+        # One ETL subflow per table; waiting starts while submission continues
+        logger.info("Running 20 ETL subflows...")
+        async with get_client() as client:
+            # Don't submit more runs than the pool can execute at once; the
+            # rest would only sit in AwaitingWorker and get polled for nothing
+            pool_limit = await read_pool_concurrency_limit(client, WORK_POOL)
+            if pool_limit is not None and pool_limit < 20:
+                logger.warning(
+                    f"Work pool {WORK_POOL!r} runs {pool_limit} flows at a time; "
+                    f"throttling 20 ETL subflows to match"
+                )
+            table_run_ids = await stream_subflows(
+                DEPLOYMENT_PATHS["process-table-etl-deployment"],
+                ({"table": table} for table in range(20)),
+                client=client,
+                max_active=pool_limit,
+            )
+        logger.info(f"All {len(table_run_ids)} ETL subflows finished")
+    else:
+        # All tables in one flow run; they share its bookkeeping and worker pickup
+        logger.info("Running ETL for 20 tables in a single subflow...")
+        await run_and_wait(
+            DEPLOYMENT_PATHS["process-all-tables-deployment"], parameters={"n": 20}
+        )
+        logger.info("Table ETL subflow finished")
 
     # Now run cleanup as separate subflows
     logger.info("Starting cleanup subflows...")
-
-    cleanup_run_ids = [
-        await trigger_subflow("cleanup-flow-1/cleanup-flow-1-deployment"),
-        await trigger_subflow("cleanup-flow-2/cleanup-flow-2-deployment"),
-    ]
-
-    # Wait for cleanup to finish
-    await wait_for_flow_runs(cleanup_run_ids)
+    await run_and_wait(
+        DEPLOYMENT_PATHS["cleanup-flow-1-deployment"],
+        DEPLOYMENT_PATHS["cleanup-flow-2-deployment"],
+    )
     logger.info("Cleanup completed")
 
     logger.info("Sub-ETL orchestration completed.")
-    return {"completed_tables": len(flow_run_ids)}
+    return {"completed_tables": 20}
 
 
-@flow(name="final-etl-job", log_prints=True)
-def final_etl():
+@flow(
+    name="final-etl-job",
+    log_prints=True,
+    persist_result=False,
+    task_runner=ConcurrentTaskRunner(),
+)
+async def final_etl():
     """
     Final ETL flow that runs after all processing completes.
     Performs finalization tasks like aggregation, reporting, or validation.
@@ -269,83 +531,30 @@ def final_etl():
     logger.info("Starting final ETL processing...")
 
     # Simulate final ETL work (e.g., aggregation, reporting)
-    result = final_etl_task()
+    result = await final_etl_task()
 
     logger.info("Final ETL processing completed.")
     return result
 
 
-async def wait_for_flow_runs(flow_run_ids: list):
+@flow(name="process-all-tables", log_prints=True, task_runner=ConcurrentTaskRunner())
+async def process_all_tables(n: int = 20):
     """
-    Wait for all flow runs to complete.
-    Polls the Prefect API to check flow run states.
+    Subflow that processes tables 0..n-1 as mapped sql_query tasks.
+    One flow run covers every table, so there is a single run to schedule;
+    the async tasks overlap on the flow's event loop instead of blocking it.
     """
-    logger = get_run_logger()
-
-    async with get_client() as client:
-        pending_ids = set(flow_run_ids)
-
-        while pending_ids:
-            # Check status of pending flow runs
-            for run_id in list(pending_ids):
-                flow_run = await client.read_flow_run(run_id)
-
-                if flow_run.state.is_final():
-                    if flow_run.state.is_completed():
-                        logger.info(f"Flow run {run_id} completed successfully")
-                    elif flow_run.state.is_failed():
-                        logger.error(
-                            f"Flow run {run_id} failed: {flow_run.state.message}"
-                        )
-                    elif flow_run.state.is_crashed():
-                        logger.error(
-                            f"Flow run {run_id} crashed: {flow_run.state.message}"
-                        )
-                    elif flow_run.state.is_cancelled():
-                        logger.warning(f"Flow run {run_id} was cancelled")
-
-                    pending_ids.remove(run_id)
-
-            if pending_ids:
-                # Still have pending runs, wait before checking again
-                await asyncio.sleep(2)
-
-        logger.info("All flow runs completed")
-
-
-@flow(name="process-table-etl", log_prints=True)
-def process_table_etl(table: int):
-    """
-    Subflow that processes a single table.
-    This will be executed by workers from the work pool.
-    """
-    logger = get_run_logger()
-    logger.info(f"Processing table {table} ETL...")
-
-    # Call the actual ETL task
-    result = sql_query(table)
-
-    logger.info(f"Table {table} ETL completed")
-    return result
+    futures = await sql_query.map(list(range(n)))
+    return await asyncio.gather(*(future.result() for future in futures))
 
 
 @task(
-    name="sql-query-task",
+    name="pre-etl-task",
     log_prints=True,
-    tags=["database"],
-    retries=2,
-    retry_delay_seconds=10,
+    persist_result=False,
+    tags=["pre-processing"],
 )
-def sql_query(table):
-    logger = get_run_logger()
-    logger.info(f"Running SQL query for table {table}...")
-    time.sleep(30)
-    logger.info(f"SQL query completed for table {table}")
-    return {"table": table, "status": "success"}
-
-
-@task(name="pre-etl-task", log_prints=True, tags=["pre-processing"])
-def pre_etl_task():
+async def pre_etl_task():
     """
     Pre-ETL task for setup and validation.
     """
@@ -354,13 +563,18 @@ def pre_etl_task():
     logger.info("- Validating data sources")
     logger.info("- Setting up connections")
     logger.info("- Preparing workspace")
-    time.sleep(10)  # Simulate pre-processing work
+    await asyncio.sleep(10)  # Simulate pre-processing work
     logger.info("Pre-ETL task completed.")
     return {"status": "pre_etl_complete", "sources_validated": True}
 
 
-@task(name="final-etl-task", log_prints=True, tags=["post-processing"])
-def final_etl_task():
+@task(
+    name="final-etl-task",
+    log_prints=True,
+    persist_result=False,
+    tags=["post-processing"],
+)
+async def final_etl_task():
     """
     Final ETL task for aggregation and reporting.
     """
@@ -369,89 +583,67 @@ def final_etl_task():
     logger.info("- Aggregating results")
     logger.info("- Generating reports")
     logger.info("- Validating outputs")
-    time.sleep(15)  # Simulate final processing work
+    await asyncio.sleep(15)  # Simulate final processing work
     logger.info("Final ETL task completed.")
     return {"status": "final_etl_complete", "reports_generated": True}
 
 
-@flow(name="cleanup-flow-1", log_prints=True)
-def cleanup_flow1():
-    """
-    Cleanup subflow - will be executed by workers from work pool.
-    """
-    logger = get_run_logger()
-    logger.info("Cleaning up resources...")
-    result = cleanup_task1()
-    logger.info("Cleanup flow 1 done.")
-    return result
-
-
-@flow(name="cleanup-flow-2", log_prints=True)
-def cleanup_flow2():
-    """
-    Cleanup subflow - will be executed by workers from work pool.
-    """
-    logger = get_run_logger()
-    logger.info("Finalizing cleanup...")
-    result = cleanup_task2()
-    logger.info("Cleanup flow 2 finalized.")
-    return result
-
-
-@task(name="cleanup-task-1", log_prints=True)
-def cleanup_task1():
-    logger = get_run_logger()
-    logger.info("Executing cleanup task 1...")
-    time.sleep(5)
-    logger.info("Cleanup task 1 done.")
-    return {"status": "cleanup1_complete"}
-
-
-@task(name="cleanup-task-2", log_prints=True)
-def cleanup_task2():
-    logger = get_run_logger()
-    logger.info("Executing cleanup task 2...")
-    time.sleep(5)
-    logger.info("Cleanup task 2 finalized.")
-    return {"status": "cleanup2_complete"}
-
-
 # ============================================================================
 # Deployment Management
 # ============================================================================
 
-# Link flow functions to deployment configs
-DEPLOYMENT_CONFIGS[0].flow_func = main_etl
-DEPLOYMENT_CONFIGS[1].flow_func = pre_etl
-DEPLOYMENT_CONFIGS[2].flow_func = sub_etl
-DEPLOYMENT_CONFIGS[3].flow_func = final_etl
-DEPLOYMENT_CONFIGS[4].flow_func = process_table_etl
-DEPLOYMENT_CONFIGS[5].flow_func = cleanup_flow1
-DEPLOYMENT_CONFIGS[6].flow_func = cleanup_flow2
+# Link each deployment spec to its flow: deployment name -> (flow, spec)
+DEPLOYMENTS: Dict[str, Tuple[Flow, DeploymentSpec]] = {
+    spec.deployment_name: (flow_func, spec)
+    for flow_func, spec in zip(
+        (
+            main_etl,
+            pre_etl,
+            sub_etl,
+            final_etl,
+            process_table_etl,
+            process_all_tables,
+            cleanup_flow1,
+            cleanup_flow2,
+        ),
+        DEPLOYMENT_SPECS,
+        strict=True,
+    )
+}
+
+# Deployment name -> "flow-name/deployment-name", resolved once at import
+DEPLOYMENT_PATHS: Dict[str, str] = {
+    name: f"{flow_func.name}/{name}" for name, (flow_func, _) in DEPLOYMENTS.items()
+}
 
 
-def deploy_all_flows(work_pool: str) -> None:
+async def deploy_all_flows(work_pool: str) -> None:
     """
     Deploy all flows to the work pool.
+    Builds and applies every deployment concurrently, so the API round-trips overlap.
 
     Args:
         work_pool: Name of the work pool to deploy to
     """
     print("\n🚀 Deploying flows to work pool...")
 
-    for config in DEPLOYMENT_CONFIGS:
-        deployment = Deployment.build_from_flow(
-            flow=config.flow_func,
-            name=config.deployment_name,
-            work_pool_name=work_pool,
-            description=config.description,
+    deployments = await asyncio.gather(
+        *(
+            Deployment.build_from_flow(
+                flow=flow_func,
+                name=spec.deployment_name,
+                work_pool_name=work_pool,
+                description=spec.description,
+            )
+            for flow_func, spec in DEPLOYMENTS.values()
         )
-        deployment.apply()
+    )
+    await asyncio.gather(*(deployment.apply() for deployment in deployments))
 
-        flow_name = config.flow_func.name
-        print(f"✅ Deployed: {flow_name}")
+    for flow_func, _ in DEPLOYMENTS.values():
+        print(f"✅ Deployed: {flow_func.name}")
 
-    print(f"\n🎉 All {len(DEPLOYMENT_CONFIGS)} deployments created successfully!")
+    print(f"\n🎉 All {len(DEPLOYMENTS)} deployments created successfully!")
     print(f"\n💡 Next: Start workers with:")
     print(f"   prefect worker start --pool {work_pool}")
 
@@ -461,59 +653,4 @@ def deploy_all_flows(work_pool: str) -> None:
 # ============================================================================
 
 if __name__ == "__main__":
-    # Check for authentication configuration
-    prefect_api_url = os.getenv("PREFECT_API_URL", "http://localhost:4200/api")
-    prefect_api_key = os.getenv("PREFECT_API_KEY")
-    work_pool = os.getenv("PREFECT_WORK_POOL", "default-pool")
-
-    print("=" * 70)
-    print("PREFECT DISTRIBUTED ETL FLOW (Work Pool)")
-    print("=" * 70)
-    print(f"🔗 Prefect Server: {prefect_api_url}")
-    print(f"🏊 Work Pool: {work_pool}")
-
-    if prefect_api_key:
-        print(f"🔐 Using API Key: {prefect_api_key[:8]}...")
-    else:
-        print("⚠️  No API key (development mode)")
-
-    print("=" * 70)
-    print("\n📋 DEPLOYMENT INSTRUCTIONS:")
-    print("-" * 70)
-    print("This flow uses work pools for distributed execution.")
-    print("Follow these steps:")
-    print()
-    print("1. Deploy all flows to work pool:")
-    print("   python flows/prefect_flow-worker-flow.py deploy")
-    print()
-    print("2. Start workers to process flows:")
-    print(f"   prefect worker start --pool {work_pool}")
-    print()
-    print("3. Run the main orchestrator flow:")
-    print("   python flows/prefect_flow-worker-flow.py run")
-    print()
-    print("Or use the deployment from UI:")
-    print(f"   - Visit: {prefect_api_url.replace('/api', '')}")
-    print("   - Navigate to Deployments")
-    print("   - Find 'main-etl-job' and click 'Run'")
-    print("=" * 70)
-
-    import sys
-
-    if len(sys.argv) > 1:
-        command = sys.argv[1]
-
-        if command == "deploy":
-            deploy_all_flows(work_pool)
-
-        elif command == "run":
-            # Run the main flow directly (for testing)
-            print("\n▶️  Running main ETL flow...")
-            print("⚠️  Make sure workers are running!")
-            asyncio.run(main_etl())
-
-        else:
-            print(f"\n❌ Unknown command: {command}")
-            print("   Use: deploy, run")
-    else:
-        print("\n⚠️  No command specified. Use: deploy, run")
+    run_cli(main_etl, deploy_all_flows, __file__)
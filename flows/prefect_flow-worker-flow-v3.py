@@ -1,13 +1,30 @@
-import time
 import os
-from typing import List, Dict, Any
+import random
+from typing import AsyncIterator, Iterable, List, Dict, Any, Optional, Tuple
+from contextlib import asynccontextmanager
 from dataclasses import dataclass
+from functools import cached_property
 from prefect import task, flow, get_run_logger
-from prefect.deployments import run_deployment, Deployment
-from prefect.client.orchestration import get_client
-from prefect.client.schemas.filters import FlowRunFilter
+from prefect.task_runners import ConcurrentTaskRunner
+from prefect.deployments import Deployment
+from prefect.client.orchestration import PrefectClient, get_client
+from prefect.client.schemas.filters import (
+    FlowRunFilter,
+    FlowRunFilterId,
+    FlowRunFilterState,
+    FlowRunFilterStateType,
+)
 from prefect.client.schemas.objects import StateType
 import asyncio
+from uuid import UUID
+
+from _common import (
+    cleanup_task1,
+    cleanup_task2,
+    create_subflow_run,
+    process_table_etl,
+    run_cli,
+)
 
 
 # ============================================================================
@@ -23,11 +40,10 @@ class DeploymentConfig:
     deployment_name: str
     description: str
 
-    @property
+    @cached_property
     def deployment_path(self) -> str:
-        """Get the full deployment path for run_deployment."""
-        flow_name = self.flow_func.__name__.replace("_", "-")
-        return f"{flow_name}/{self.deployment_name}"
+        """Get the full "flow-name/deployment-name" path (computed once)."""
+        return f"{self.flow_func.name}/{self.deployment_name}"
 
 
 # Define all deployments in one place
@@ -59,80 +75,250 @@ DEPLOYMENT_CONFIGS = [
     ),
     DeploymentConfig(
         flow_func=None,
-        deployment_name="cleanup-flow-1-deployment",
-        description="Cleanup subflow 1",
-    ),
-    DeploymentConfig(
-        flow_func=None,
-        deployment_name="cleanup-flow-2-deployment",
-        description="Cleanup subflow 2",
+        deployment_name="cleanup-flow-deployment",
+        description="Cleanup subflow running both cleanup tasks",
     ),
 ]
 
 
+# Set PREFECT_ETL_RETURN_RUN_IDS=1 to include every subflow run ID in
+# main_etl's result (for debugging); by default only counts are returned
+RETURN_RUN_IDS = os.getenv("PREFECT_ETL_RETURN_RUN_IDS") == "1"
+
+# Maximum number of deployments built and applied at the same time
+DEPLOY_FANOUT = 16
+
+
 # ============================================================================
 # Utility Functions
 # ============================================================================
 
 
+# "flow-name/deployment-name" -> deployment ID, filled on first use
+_DEPLOYMENT_IDS: Dict[str, UUID] = {}
+
+
+async def resolve_deployment_id(client: PrefectClient, deployment_path: str) -> UUID:
+    """
+    Look up a deployment's ID by path, caching it for every later submitter.
+
+    Args:
+        client: Open Prefect client
+        deployment_path: Full path to deployment (e.g., "process-table-etl/process-table-etl-deployment")
+
+    Returns:
+        Deployment ID
+    """
+    if deployment_path not in _DEPLOYMENT_IDS:
+        deployment = await client.read_deployment_by_name(deployment_path)
+        _DEPLOYMENT_IDS[deployment_path] = deployment.id
+    return _DEPLOYMENT_IDS[deployment_path]
+
+
+# Terminal states a waited-on flow run can end up in
+FINAL_STATE_TYPES = [
+    StateType.COMPLETED,
+    StateType.FAILED,
+    StateType.CRASHED,
+    StateType.CANCELLED,
+]
+
+
+# Client shared by every FlowSubmission while get_shared_client() is open
+_shared_client: Optional[PrefectClient] = None
+
+
+@asynccontextmanager
+async def get_shared_client() -> AsyncIterator[PrefectClient]:
+    """
+    Open one Prefect client for every submitter in this flow run.
+    Nested uses reuse the client that is already open instead of connecting again.
+    """
+    global _shared_client
+    if _shared_client is not None:
+        yield _shared_client
+        return
+
+    async with get_client() as client:
+        _shared_client = client
+        try:
+            yield client
+        finally:
+            _shared_client = None
+
+
 class FlowSubmission:
     """
     Submit Prefect flow deployments asynchronously and wait for their completion.
     Designed for use with Prefect 2.13.x worker pools.
+
+    Submissions are buffered and created in concurrent batches: the buffer is
+    flushed once it holds `submission_threshold` runs, on the event-loop
+    iteration after a submit(), and by wait(). Each run is created as a
+    subflow of the calling flow run.
     """
 
-    def __init__(self, deployment_path: str):
+    def __init__(self, deployment_path: str, submission_threshold: int = 64):
         self.deployment_path = deployment_path
+        self.submission_threshold = submission_threshold
         self.run_ids: List[str] = []
         self.results: Dict[str, str] = {}
+        # Queued parameters, each with the future its flow_run_id is set on
+        self._pending: List[Tuple[Dict[str, Any], asyncio.Future]] = []
+        self._deployment_id: Optional[UUID] = None
+
+    def _queue(self, parameters: Dict[str, Any]) -> asyncio.Future:
+        """Queue a flow run's parameters; its ID is set on the returned future."""
+        run_id = asyncio.get_running_loop().create_future()
+        self._pending.append((parameters, run_id))
+        return run_id
 
-    async def submit(self, **parameters) -> str:
+    async def submit(self, **parameters) -> UUID:
         """
-        Submit a flow run asynchronously via the specified deployment.
+        Submit a flow run of the deployment with the given parameters.
+
+        Gathered submit() calls are created together in one batch: each yields
+        once so its siblings can join the buffer before it is flushed.
         Returns the flow_run_id for tracking.
         """
-        flow_run = await run_deployment(
-            name=self.deployment_path,
-            parameters=parameters,
-            timeout=0,
-            schedule=True,  # ensure run is queued immediately for workers
-        )
-        self.run_ids.append(flow_run.id)
-        return flow_run.id
+        run_id = self._queue(parameters)
+        if len(self._pending) < self.submission_threshold:
+            await asyncio.sleep(0)
+        _, run_id = await asyncio.gather(self.flush(), run_id)
+        return run_id
+
+    async def map(self, **iterable_parameters: Iterable[Any]) -> List[UUID]:
+        """
+        Submit one flow run per element, like task.map().
+
+        Example: `await etl.map(table=range(20))` creates 20 runs with
+        table=0..19 in a single concurrent batch. Iterables are zipped, so
+        several keyword arguments must have the same length.
+        Returns the flow_run_ids created, in order.
+        """
+        names = list(iterable_parameters)
+        run_ids = [
+            self._queue(dict(zip(names, values)))
+            for values in zip(*iterable_parameters.values(), strict=True)
+        ]
+        _, run_ids = await asyncio.gather(self.flush(), asyncio.gather(*run_ids))
+        return run_ids
+
+    async def flush(self, client: Optional[PrefectClient] = None) -> List[UUID]:
+        """
+        Create every queued flow run concurrently over one client.
+        The deployment ID is resolved on the first flush only, and shared with
+        other submitters for the same deployment via resolve_deployment_id().
+        Returns the flow_run_ids created by this flush.
+        """
+        if not self._pending:
+            return []
+
+        if client is None:
+            async with get_shared_client() as client:
+                return await self.flush(client=client)
+
+        batch, self._pending = self._pending, []
+        try:
+            if self._deployment_id is None:
+                self._deployment_id = await resolve_deployment_id(
+                    client, self.deployment_path
+                )
+
+            flow_runs = await asyncio.gather(
+                *(
+                    create_subflow_run(
+                        client, self._deployment_id, self.deployment_path, parameters
+                    )
+                    for parameters, _ in batch
+                )
+            )
+            for (_, run_id), flow_run in zip(batch, flow_runs):
+                run_id.set_result(flow_run.id)
+        except Exception as exc:
+            # Every submit() waiting on this batch fails with the same error
+            for _, run_id in batch:
+                run_id.set_exception(exc)
+            raise
+        finally:
+            # If the flush was cancelled, cancel the submits waiting on it
+            for _, run_id in batch:
+                if not run_id.done():
+                    run_id.cancel()
+
+        run_ids = [flow_run.id for flow_run in flow_runs]
+        self.run_ids.extend(run_ids)
+        return run_ids
 
     async def wait(
-        self, poll_interval: int = 5, show_summary: bool = True
+        self,
+        poll_interval: float = 5,
+        show_summary: bool = True,
+        max_poll_interval: float = 30,
+        client: Optional[PrefectClient] = None,
     ) -> Dict[str, str]:
         """
         Wait for all submitted runs to complete.
+        Polls every `poll_interval` seconds at first, backing off exponentially
+        (with jitter) up to `max_poll_interval` while no run finishes.
+        Uses `client` if given, else the shared client (opened if needed).
         Returns a dict of {flow_run_id: final_state_name}.
         """
-        if not self.run_ids:
+        if not self.run_ids and not self._pending:
             return {}
 
+        if client is None:
+            async with get_shared_client() as client:
+                return await self.wait(
+                    poll_interval, show_summary, max_poll_interval, client=client
+                )
+
+        await self.flush(client=client)
+
         logger = get_run_logger()
-        async with get_client() as client:
-            pending = set(self.run_ids)
-            logger.info(f"Waiting for {len(pending)} flow runs to complete...")
-
-            while pending:
-                completed = []
-                for run_id in list(pending):
-                    flow_run = await client.read_flow_run(run_id)
-                    if flow_run.state.is_final():
-                        self.results[run_id] = flow_run.state.name
-                        status_icon = "✅" if flow_run.state.is_completed() else "❌"
-                        logger.info(
-                            f"{status_icon} [{self.deployment_path}] "
-                            f"Run {run_id[:8]} finished with state: {flow_run.state.name}"
-                        )
-                        completed.append(run_id)
-
-                for c in completed:
-                    pending.remove(c)
-
-                if pending:
-                    await asyncio.sleep(poll_interval)
+        pending = set(self.run_ids)
+        delay = poll_interval
+        logger.info(f"Waiting for {len(pending)} flow runs to complete...")
+
+        while pending:
+            # One query per cycle, returning only the pending runs that finished
+            flow_runs = await client.read_flow_runs(
+                flow_run_filter=FlowRunFilter(
+                    id=FlowRunFilterId(any_=list(pending)),
+                    state=FlowRunFilterState(
+                        type=FlowRunFilterStateType(any_=FINAL_STATE_TYPES)
+                    ),
+                )
+            )
+            completed = {flow_run.id for flow_run in flow_runs}
+            succeeded = []
+            for flow_run in flow_runs:
+                self.results[flow_run.id] = flow_run.state.name
+                if flow_run.state.is_completed():
+                    succeeded.append(str(flow_run.id)[:8])
+                else:
+                    # Unsuccessful runs keep a line each for debugging
+                    logger.error(
+                        f"❌ [{self.deployment_path}] "
+                        f"Run {flow_run.id} finished with state: "
+                        f"{flow_run.state.name} ({flow_run.state.message})"
+                    )
+
+            pending -= completed
+
+            if completed:
+                logger.info(
+                    f"✅ [{self.deployment_path}] {len(succeeded)} run(s) completed "
+                    f"{succeeded}, {len(completed) - len(succeeded)} unsuccessful, "
+                    f"{len(pending)} remaining"
+                )
+
+            if pending:
+                if completed:
+                    delay = poll_interval
+                else:
+                    delay = min(delay * 2, max_poll_interval)
+                await asyncio.sleep(delay + random.uniform(0, 0.25 * delay))
 
         if show_summary:
             total = len(self.results)
@@ -150,8 +336,8 @@ def flow_submitter(deployment_path: str) -> FlowSubmission:
     Example:
         etl = flow_submitter("etl-parent/etl-child-deployment")
 
-        # Submit multiple flows asynchronously
-        await asyncio.gather(
+        # Submit multiple flow runs; gathered, they are created in one batch
+        run_ids = await asyncio.gather(
             etl.submit(table="customer"),
             etl.submit(table="orders"),
             etl.submit(table="sales"),
@@ -185,33 +371,47 @@ async def main_etl():
     pre_etl = flow_submitter("pre-etl-job/pre-etl-deployment")
     sub_etl = flow_submitter("sub-etl-job/sub-etl-deployment")
 
-    # Submit both (like task.submit())
-    await pre_etl.submit()
-    await sub_etl.submit()
+    # One client shared by every submitter in this flow run
+    async with get_shared_client():
+        # Submit both (like task.submit()), creating the two runs concurrently
+        await asyncio.gather(pre_etl.submit(), sub_etl.submit())
 
-    # Wait for both to complete (like future.result())
-    await pre_etl.wait()
-    await sub_etl.wait()
-    logger.info("Phase 1 completed: pre_etl and sub_etl finished")
+        # Wait for both to complete (like future.result()); gathered, so each
+        # wait sees its own run finish as soon as it does
+        await asyncio.gather(pre_etl.wait(), sub_etl.wait())
+        logger.info("Phase 1 completed: pre_etl and sub_etl finished")
 
-    # Phase 2: Run final_etl after both complete
-    logger.info("Phase 2: Starting final_etl...")
-    final_etl = flow_submitter("final-etl-job/final-etl-deployment")
-    await final_etl.submit()
-    await final_etl.wait()
-    logger.info("Phase 2 completed: final_etl finished")
+        # Phase 2: Run final_etl after both complete
+        logger.info("Phase 2: Starting final_etl...")
+        final_etl = flow_submitter("final-etl-job/final-etl-deployment")
+        await final_etl.submit()
+        await final_etl.wait()
+        logger.info("Phase 2 completed: final_etl finished")
 
     logger.info("ETL flow completed successfully.")
-    return {
-        "pre_etl_run_ids": pre_etl.run_ids,
-        "sub_etl_run_ids": sub_etl.run_ids,
-        "final_etl_run_ids": final_etl.run_ids,
+    # Counts keep the persisted result small; full run ID lists are opt-in
+    result = {
+        "pre_etl_count": len(pre_etl.run_ids),
+        "sub_etl_count": len(sub_etl.run_ids),
+        "final_etl_count": len(final_etl.run_ids),
         "status": "completed",
     }
+    if RETURN_RUN_IDS:
+        result.update(
+            pre_etl_run_ids=pre_etl.run_ids,
+            sub_etl_run_ids=sub_etl.run_ids,
+            final_etl_run_ids=final_etl.run_ids,
+        )
+    return result
 
 
-@flow(name="pre-etl-job", log_prints=True)
-def pre_etl():
+@flow(
+    name="pre-etl-job",
+    log_prints=True,
+    persist_result=False,
+    task_runner=ConcurrentTaskRunner(),
+)
+async def pre_etl():
     """
     Pre-ETL flow that runs before main processing.
     Performs setup, validation, or preparatory tasks.
@@ -220,7 +420,7 @@ def pre_etl():
     logger.info("Starting pre-ETL processing...")
 
     # Simulate pre-ETL work (e.g., data validation, setup)
-    result = pre_etl_task()
+    result = await pre_etl_task()
 
     logger.info("Pre-ETL processing completed.")
     return result
@@ -241,31 +441,37 @@ async def sub_etl():
     logger.info("Submitting 20 ETL subflows...")
     table_etl = flow_submitter("process-table-etl/process-table-etl-deployment")
 
-    for table in range(20):
-        await table_etl.submit(table=table)
+    # One client shared by every submitter in this flow run
+    async with get_shared_client():
+        # Create one run per table in a single concurrent batch
+        await table_etl.map(table=range(20))
 
-    # Wait for all tables to complete
-    logger.info(f"Waiting for all {len(table_etl.run_ids)} ETL subflows to complete...")
-    await table_etl.wait()
-    logger.info(f"All {len(table_etl.run_ids)} ETL subflows completed successfully")
+        # Wait for all tables to complete
+        logger.info(
+            f"Waiting for all {len(table_etl.run_ids)} ETL subflows to complete..."
+        )
+        await table_etl.wait()
+        logger.info(f"All {len(table_etl.run_ids)} ETL subflows completed successfully")
 
-    # Now run cleanup as separate subflows
-    logger.info("Starting cleanup subflows...")
-    cleanup1 = flow_submitter("cleanup-flow-1/cleanup-flow-1-deployment")
-    cleanup2 = flow_submitter("cleanup-flow-2/cleanup-flow-2-deployment")
+        # Now run cleanup as one subflow (both cleanup tasks run inside it)
+        logger.info("Starting cleanup subflow...")
+        cleanup = flow_submitter("cleanup-flow/cleanup-flow-deployment")
 
-    await cleanup1.submit()
-    await cleanup2.submit()
-    await cleanup1.wait()
-    await cleanup2.wait()
+        await cleanup.submit()
+        await cleanup.wait()
 
     logger.info("Cleanup completed")
     logger.info("Sub-ETL orchestration completed.")
     return {"completed_tables": len(table_etl.run_ids)}
 
 
-@flow(name="final-etl-job", log_prints=True)
-def final_etl():
+@flow(
+    name="final-etl-job",
+    log_prints=True,
+    persist_result=False,
+    task_runner=ConcurrentTaskRunner(),
+)
+async def final_etl():
     """
     Final ETL flow that runs after all processing completes.
     Performs finalization tasks like aggregation, reporting, or validation.
@@ -274,45 +480,19 @@ def final_etl():
     logger.info("Starting final ETL processing...")
 
     # Simulate final ETL work (e.g., aggregation, reporting)
-    result = final_etl_task()
+    result = await final_etl_task()
 
     logger.info("Final ETL processing completed.")
     return result
 
 
-@flow(name="process-table-etl", log_prints=True)
-def process_table_etl(table: int):
-    """
-    Subflow that processes a single table.
-    This will be executed by workers from the work pool.
-    """
-    logger = get_run_logger()
-    logger.info(f"Processing table {table} ETL...")
-
-    # Call the actual ETL task
-    result = sql_query(table)
-
-    logger.info(f"Table {table} ETL completed")
-    return result
-
-
 @task(
-    name="sql-query-task",
+    name="pre-etl-task",
     log_prints=True,
-    tags=["database"],
-    retries=2,
-    retry_delay_seconds=10,
+    persist_result=False,
+    tags=["pre-processing"],
 )
-def sql_query(table):
-    logger = get_run_logger()
-    logger.info(f"Running SQL query for table {table}...")
-    time.sleep(30)
-    logger.info(f"SQL query completed for table {table}")
-    return {"table": table, "status": "success"}
-
-
-@task(name="pre-etl-task", log_prints=True, tags=["pre-processing"])
-def pre_etl_task():
+async def pre_etl_task():
     """
     Pre-ETL task for setup and validation.
     """
@@ -321,13 +501,18 @@ def pre_etl_task():
     logger.info("- Validating data sources")
     logger.info("- Setting up connections")
     logger.info("- Preparing workspace")
-    time.sleep(10)  # Simulate pre-processing work
+    await asyncio.sleep(10)  # Simulate pre-processing work
     logger.info("Pre-ETL task completed.")
     return {"status": "pre_etl_complete", "sources_validated": True}
 
 
-@task(name="final-etl-task", log_prints=True, tags=["post-processing"])
-def final_etl_task():
+@task(
+    name="final-etl-task",
+    log_prints=True,
+    persist_result=False,
+    tags=["post-processing"],
+)
+async def final_etl_task():
     """
     Final ETL task for aggregation and reporting.
     """
@@ -336,53 +521,32 @@ def final_etl_task():
     logger.info("- Aggregating results")
     logger.info("- Generating reports")
     logger.info("- Validating outputs")
-    time.sleep(15)  # Simulate final processing work
+    await asyncio.sleep(15)  # Simulate final processing work
     logger.info("Final ETL task completed.")
     return {"status": "final_etl_complete", "reports_generated": True}
 
 
-@flow(name="cleanup-flow-1", log_prints=True)
-def cleanup_flow1():
+@flow(
+    name="cleanup-flow",
+    log_prints=True,
+    persist_result=False,
+    task_runner=ConcurrentTaskRunner(),
+)
+async def cleanup_flow():
     """
     Cleanup subflow - will be executed by workers from work pool.
+    Runs both cleanup tasks concurrently within this single flow run.
+    Named apart from _common's cleanup-flow-1 (which runs only the first
+    task), so deploying v1/v2 and v3 doesn't overwrite each other's flow.
     """
     logger = get_run_logger()
     logger.info("Cleaning up resources...")
-    result = cleanup_task1()
-    logger.info("Cleanup flow 1 done.")
-    return result
-
-
-@flow(name="cleanup-flow-2", log_prints=True)
-def cleanup_flow2():
-    """
-    Cleanup subflow - will be executed by workers from work pool.
-    """
-    logger = get_run_logger()
-    logger.info("Finalizing cleanup...")
-    result = cleanup_task2()
-    logger.info("Cleanup flow 2 finalized.")
+    futures = [await cleanup_task1.submit(), await cleanup_task2.submit()]
+    result = await asyncio.gather(*(future.result() for future in futures))
+    logger.info("Cleanup flow done.")
     return result
 
 
-@task(name="cleanup-task-1", log_prints=True)
-def cleanup_task1():
-    logger = get_run_logger()
-    logger.info("Executing cleanup task 1...")
-    time.sleep(5)
-    logger.info("Cleanup task 1 done.")
-    return {"status": "cleanup1_complete"}
-
-
-@task(name="cleanup-task-2", log_prints=True)
-def cleanup_task2():
-    logger = get_run_logger()
-    logger.info("Executing cleanup task 2...")
-    time.sleep(5)
-    logger.info("Cleanup task 2 finalized.")
-    return {"status": "cleanup2_complete"}
-
-
 # ============================================================================
 # Deployment Management
 # ============================================================================
@@ -393,30 +557,54 @@ DEPLOYMENT_CONFIGS[1].flow_func = pre_etl
 DEPLOYMENT_CONFIGS[2].flow_func = sub_etl
 DEPLOYMENT_CONFIGS[3].flow_func = final_etl
 DEPLOYMENT_CONFIGS[4].flow_func = process_table_etl
-DEPLOYMENT_CONFIGS[5].flow_func = cleanup_flow1
-DEPLOYMENT_CONFIGS[6].flow_func = cleanup_flow2
+DEPLOYMENT_CONFIGS[5].flow_func = cleanup_flow
+
+
+async def build_deployment(config: DeploymentConfig, work_pool: str) -> Deployment:
+    """
+    Build the Deployment for a config, targeting the given work pool.
+
+    Building introspects the flow (entrypoint, parameter schema), so it is
+    deliberately not done at import: workers import this module only to run
+    flows.
+
+    Args:
+        config: Deployment configuration with its flow linked
+        work_pool: Name of the work pool to deploy to
+
+    Returns:
+        The built Deployment, ready to apply
+    """
+    return await Deployment.build_from_flow(
+        flow=config.flow_func,
+        name=config.deployment_name,
+        description=config.description,
+        work_pool_name=work_pool,
+    )
 
 
-def deploy_all_flows(work_pool: str) -> None:
+async def deploy_all_flows(work_pool: str) -> None:
     """
     Deploy all flows to the work pool.
+    Builds and applies the deployments concurrently (at most DEPLOY_FANOUT at
+    a time), so their API round-trips overlap.
 
     Args:
         work_pool: Name of the work pool to deploy to
     """
     print("\n🚀 Deploying flows to work pool...")
 
-    for config in DEPLOYMENT_CONFIGS:
-        deployment = Deployment.build_from_flow(
-            flow=config.flow_func,
-            name=config.deployment_name,
-            work_pool_name=work_pool,
-            description=config.description,
-        )
-        deployment.apply()
+    fanout = asyncio.Semaphore(DEPLOY_FANOUT)
+
+    async def deploy(config: DeploymentConfig) -> None:
+        async with fanout:
+            deployment = await build_deployment(config, work_pool)
+            await deployment.apply()
 
-        flow_name = config.flow_func.name
-        print(f"✅ Deployed: {flow_name}")
+    await asyncio.gather(*(deploy(config) for config in DEPLOYMENT_CONFIGS))
+
+    for config in DEPLOYMENT_CONFIGS:
+        print(f"✅ Deployed: {config.flow_func.name}")
 
     print(f"\n🎉 All {len(DEPLOYMENT_CONFIGS)} deployments created successfully!")
     print(f"\n💡 Next: Start workers with:")
@@ -428,59 +616,4 @@ def deploy_all_flows(work_pool: str) -> None:
 # ============================================================================
 
 if __name__ == "__main__":
-    # Check for authentication configuration
-    prefect_api_url = os.getenv("PREFECT_API_URL", "http://localhost:4200/api")
-    prefect_api_key = os.getenv("PREFECT_API_KEY")
-    work_pool = os.getenv("PREFECT_WORK_POOL", "default-pool")
-
-    print("=" * 70)
-    print("PREFECT DISTRIBUTED ETL FLOW (Work Pool)")
-    print("=" * 70)
-    print(f"🔗 Prefect Server: {prefect_api_url}")
-    print(f"🏊 Work Pool: {work_pool}")
-
-    if prefect_api_key:
-        print(f"🔐 Using API Key: {prefect_api_key[:8]}...")
-    else:
-        print("⚠️  No API key (development mode)")
-
-    print("=" * 70)
-    print("\n📋 DEPLOYMENT INSTRUCTIONS:")
-    print("-" * 70)
-    print("This flow uses work pools for distributed execution.")
-    print("Follow these steps:")
-    print()
-    print("1. Deploy all flows to work pool:")
-    print("   python flows/prefect_flow-worker-flow.py deploy")
-    print()
-    print("2. Start workers to process flows:")
-    print(f"   prefect worker start --pool {work_pool}")
-    print()
-    print("3. Run the main orchestrator flow:")
-    print("   python flows/prefect_flow-worker-flow.py run")
-    print()
-    print("Or use the deployment from UI:")
-    print(f"   - Visit: {prefect_api_url.replace('/api', '')}")
-    print("   - Navigate to Deployments")
-    print("   - Find 'main-etl-job' and click 'Run'")
-    print("=" * 70)
-
-    import sys
-
-    if len(sys.argv) > 1:
-        command = sys.argv[1]
-
-        if command == "deploy":
-            deploy_all_flows(work_pool)
-
-        elif command == "run":
-            # Run the main flow directly (for testing)
-            print("\n▶️  Running main ETL flow...")
-            print("⚠️  Make sure workers are running!")
-            asyncio.run(main_etl())
-
-        else:
-            print(f"\n❌ Unknown command: {command}")
-            print("   Use: deploy, run")
-    else:
-        print("\n⚠️  No command specified. Use: deploy, run")
+    run_cli(main_etl, deploy_all_flows, __file__)
@@ -17,10 +17,7 @@ def sub_etl():
     
     # Submit all 20 queries at once - Prefect server will control concurrency
     logger.info("Submitting all 20 queries...")
-    query_futures = []
-    for table in range(20):
-        future = sql_query.submit(table)
-        query_futures.append(future)
+    query_futures = sql_query.map(range(20))
     
     # Wait for ALL queries to complete before cleanup
     logger.info("Waiting for all queries to complete...")
@@ -42,10 +39,14 @@ def sub_etl():
 
 @task(
     name="sql-query-task",
+    task_run_name="sql-query-table-{table}",
     log_prints=True,
     tags=["database"],
-    retries=2,
-    retry_delay_seconds=10
+    # Exponential backoff with jitter so retries of many tables rejected by the
+    # "database" concurrency limit don't all come back at the same moment
+    retries=3,
+    retry_delay_seconds=[2, 8, 32],
+    retry_jitter_factor=0.5
 )
 def sql_query(table):
     logger = get_run_logger()
@@ -78,21 +79,23 @@ if __name__ == "__main__":
     prefect_api_url = os.getenv("PREFECT_API_URL", "http://localhost:4200/api")
     prefect_api_key = os.getenv("PREFECT_API_KEY")
     
-    print("=" * 70)
-    print("PREFECT ETL FLOW")
-    print("=" * 70)
-    print(f"🔗 Prefect Server: {prefect_api_url}")
-    
+    # Build the whole banner first and write it out in one go
+    banner = [
+        "=" * 70,
+        "PREFECT ETL FLOW",
+        "=" * 70,
+        f"🔗 Prefect Server: {prefect_api_url}",
+    ]
+
     if prefect_api_key:
-        print(f"🔐 Using API Key: {prefect_api_key[:8]}...")
+        banner.append(f"🔐 Using API Key: {prefect_api_key[:8]}...")
         # Note: When using .serve(), Prefect automatically picks up PREFECT_API_KEY
         # from environment variables for authentication
     else:
-        print("⚠️  No API key (development mode)")
-    
-    print("=" * 70)
-    print("\nStarting flow server...")
-    print("Press Ctrl+C to stop\n")
-    
+        banner.append("⚠️  No API key (development mode)")
+
+    banner += ["=" * 70, "\nStarting flow server...", "Press Ctrl+C to stop\n"]
+    print("\n".join(banner))
+
     # The .serve() method will automatically use PREFECT_API_KEY if set
     main_etl().serve(name="etl-job")
@@ -0,0 +1,21 @@
+"""
+Event-loop setup shared by the async setup scripts.
+
+The scripts run as `python scripts/<script>.py`, which puts this directory on
+sys.path, so they can `from _uvloop import install_uvloop`.
+"""
+
+import asyncio
+
+
+def install_uvloop() -> None:
+    """
+    Make asyncio.run() use uvloop's faster event loop for the API calls.
+    Leaves the default asyncio loop in place when uvloop is not installed.
+    """
+    try:
+        import uvloop
+    except ImportError:
+        return
+
+    asyncio.set_event_loop_policy(uvloop.EventLoopPolicy())
@@ -14,62 +14,65 @@ import os
 from prefect.client.orchestration import get_client
 from prefect.settings import PREFECT_API_KEY
 
+from _uvloop import install_uvloop
 
-async def create_concurrency_limit(limit_name: str, max_concurrent: int, api_key: str = None):
+
+async def create_concurrency_limit(client, limit_name: str, max_concurrent: int) -> bool:
     """
     Create a concurrency limit on the Prefect server.
     
     Args:
+        client: Open Prefect client
         limit_name: Name for the concurrency limit (e.g., "database")
         max_concurrent: Maximum number of concurrent tasks (e.g., 3)
-        api_key: Optional API key for authentication (production)
-    """
-    # Set up httpx settings with auth headers if API key provided
-    httpx_settings = {}
-    if api_key:
-        httpx_settings["headers"] = {"Authorization": f"Bearer {api_key}"}
     
-    async with get_client(httpx_settings=httpx_settings) as client:
-        try:
-            # Create the concurrency limit
-            await client.create_concurrency_limit(
-                tag=limit_name,
-                concurrency_limit=max_concurrent
-            )
-            print(f"✅ Created concurrency limit: '{limit_name}' = {max_concurrent}")
-            print(f"   Tasks tagged with '{limit_name}' will be limited to {max_concurrent} concurrent runs")
-        except Exception as e:
-            if "already exists" in str(e).lower():
-                print(f"⚠️  Concurrency limit '{limit_name}' already exists")
-                print(f"   To update it, delete the old one first via the UI or API")
-            else:
-                print(f"❌ Error creating concurrency limit: {e}")
-                raise
-
-
-async def list_concurrency_limits(api_key: str = None):
+    Returns:
+        True if the limit was created, False if it already existed
     """
-    List all existing concurrency limits.
+    try:
+        # Create the concurrency limit
+        await client.create_concurrency_limit(
+            tag=limit_name,
+            concurrency_limit=max_concurrent
+        )
+        print(f"✅ Created concurrency limit: '{limit_name}' = {max_concurrent}")
+        print(f"   Tasks tagged with '{limit_name}' will be limited to {max_concurrent} concurrent runs")
+        return True
+    except Exception as e:
+        if "already exists" in str(e).lower():
+            print(f"⚠️  Concurrency limit '{limit_name}' already exists")
+            print(f"   To update it, delete the old one first via the UI or API")
+            return False
+        print(f"❌ Error creating concurrency limit: {e}")
+        raise
+
+
+async def list_concurrency_limits(client) -> dict:
+    """
+    Read all existing concurrency limits.
     
     Args:
-        api_key: Optional API key for authentication (production)
-    """
-    # Set up httpx settings with auth headers if API key provided
-    httpx_settings = {}
-    if api_key:
-        httpx_settings["headers"] = {"Authorization": f"Bearer {api_key}"}
+        client: Open Prefect client
     
-    async with get_client(httpx_settings=httpx_settings) as client:
-        try:
-            limits = await client.read_concurrency_limits()
-            if limits:
-                print(f"\n📋 Existing Concurrency Limits:")
-                for limit in limits:
-                    print(f"   • {limit.tag}: max {limit.concurrency_limit} concurrent tasks")
-            else:
-                print("\n📋 No concurrency limits configured yet")
-        except Exception as e:
-            print(f"❌ Error reading concurrency limits: {e}")
+    Returns:
+        Mapping of tag -> max concurrent tasks (empty if they couldn't be read)
+    """
+    try:
+        limits = await client.read_concurrency_limits()
+    except Exception as e:
+        print(f"❌ Error reading concurrency limits: {e}")
+        return {}
+    return {limit.tag: limit.concurrency_limit for limit in limits}
+
+
+def print_concurrency_limits(limits: dict):
+    """Print concurrency limits as returned by list_concurrency_limits()."""
+    if limits:
+        print(f"\n📋 Existing Concurrency Limits:")
+        for tag, concurrency_limit in limits.items():
+            print(f"   • {tag}: max {concurrency_limit} concurrent tasks")
+    else:
+        print("\n📋 No concurrency limits configured yet")
 
 
 async def main():
@@ -90,19 +93,24 @@ async def main():
         print("⚠️  No API key found (OK for development)")
         print("   For production, set PREFECT_API_KEY environment variable")
     
-    # List existing limits
-    await list_concurrency_limits(api_key=prefect_api_key)
-    
-    # Create concurrency limit for database tasks
-    print("\n📝 Creating new concurrency limit...")
-    await create_concurrency_limit(
-        limit_name="database",
-        max_concurrent=3,  # Only 3 database queries at a time
-        api_key=prefect_api_key
-    )
+    # Set up httpx settings with auth headers if API key provided
+    httpx_settings = {}
+    if prefect_api_key:
+        httpx_settings["headers"] = {"Authorization": f"Bearer {prefect_api_key}"}
     
-    # Show updated list
-    await list_concurrency_limits(api_key=prefect_api_key)
+    # One client (and connection) for every call below
+    async with get_client(httpx_settings=httpx_settings) as client:
+        # List existing limits
+        limits = await list_concurrency_limits(client)
+        print_concurrency_limits(limits)
+        
+        # Create concurrency limit for database tasks
+        print("\n📝 Creating new concurrency limit...")
+        max_concurrent = 3  # Only 3 database queries at a time
+        if await create_concurrency_limit(client, "database", max_concurrent):
+            # Show updated list without reading every limit back from the server
+            limits["database"] = max_concurrent
+            print_concurrency_limits(limits)
     
     print("\n" + "=" * 70)
     print("✅ SETUP COMPLETE!")
@@ -129,4 +137,6 @@ For production with authentication:
 
 
 if __name__ == "__main__":
+    install_uvloop()
+
     asyncio.run(main())
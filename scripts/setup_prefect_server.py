@@ -42,12 +42,15 @@ import sys
 import time
 
 import httpx
-from prefect.client.orchestration import get_client
+from prefect.client.orchestration import PrefectClient, get_client
+from prefect.exceptions import ObjectNotFound
 from prefect.settings import (
     PREFECT_API_URL,
     PREFECT_API_KEY,
 )
 
+from _uvloop import install_uvloop
+
 
 class PrefectServerSetup:
     """Handles complete Prefect server setup and configuration."""
@@ -107,14 +110,36 @@ class PrefectServerSetup:
             "PREFECT_WORK_POOL", "default-pool"
         )
 
+        # One client for all health probes, so repeated checks (especially the
+        # polling in wait_for_server_ready) reuse a pooled connection instead of
+        # opening a new one per request. Released by close().
+        self._probe = httpx.Client(timeout=5)
+
+        # When the server last answered successfully; verify_setup skips its
+        # own connectivity check if that was within the last few seconds
+        self._health_cache = {"ok_at": 0.0, "ttl": 5}
+
+    def close(self) -> None:
+        """Close the health-probe HTTP client."""
+        self._probe.close()
+
+    def _mark_healthy(self) -> None:
+        """Record that the server just answered a request successfully."""
+        self._health_cache["ok_at"] = time.time()
+
+    def _recently_healthy(self) -> bool:
+        """Whether the server answered successfully within the cache TTL."""
+        return time.time() - self._health_cache["ok_at"] < self._health_cache["ttl"]
+
     async def check_server_connection(self) -> bool:
         """Check if we can connect to the Prefect server."""
         print(f"🔍 Checking connection to Prefect server...")
         print(f"   API URL: {self.api_url}")
 
         try:
-            response = httpx.get(f"{self.api_url}/health", timeout=5)
+            response = self._probe.get(f"{self.api_url}/health")
             if response.status_code == 200:
+                self._mark_healthy()
                 print(f"✅ Connected to Prefect server")
                 return True
             else:
@@ -174,131 +199,130 @@ class PrefectServerSetup:
         print(f"⏳ Waiting for server to be ready...")
 
         start_time = time.time()
+        # Probe quickly at first so a fast-starting server is seen right away,
+        # then back off (doubling, capped at 1s) while it is still coming up
+        delay = 0.05
         while time.time() - start_time < max_wait:
             try:
-                response = httpx.get(f"{self.api_url}/health", timeout=2)
+                response = self._probe.get(f"{self.api_url}/health", timeout=2)
                 if response.status_code == 200:
+                    self._mark_healthy()
                     elapsed = time.time() - start_time
                     print(f"✅ Server is ready (took {elapsed:.1f}s)")
                     return True
             except:
                 pass
 
-            time.sleep(1)
+            time.sleep(delay)
+            delay = min(delay * 2, 1.0)
             print(".", end="", flush=True)
 
         print(f"\n❌ Server did not become ready within {max_wait}s")
         return False
 
-    async def create_work_pool(self) -> bool:
+    async def create_work_pool(self, client: PrefectClient) -> bool:
         """Create a work pool for running flows."""
         print(f"\n📋 Setting up work pool '{self.work_pool_name}'...")
 
         try:
-            async with get_client() as client:
-                # Check if work pool already exists
-                try:
-                    existing_pools = await client.read_work_pools()
-                    pool_names = [pool.name for pool in existing_pools]
-
-                    if self.work_pool_name in pool_names:
-                        print(f"✅ Work pool '{self.work_pool_name}' already exists")
-                        return True
-                except Exception:
-                    pass
-
-                # Create work pool
-                await client.create_work_pool(
-                    name=self.work_pool_name,
-                    type="process",  # Process work pool for local execution
-                )
-                print(f"✅ Created work pool: '{self.work_pool_name}'")
+            # Check if work pool already exists (single-item lookup rather
+            # than listing every pool)
+            try:
+                await client.read_work_pool(self.work_pool_name)
+                self._mark_healthy()
+                print(f"✅ Work pool '{self.work_pool_name}' already exists")
                 return True
+            except ObjectNotFound:
+                pass
+
+            # Create work pool
+            await client.create_work_pool(
+                name=self.work_pool_name,
+                type="process",  # Process work pool for local execution
+            )
+            self._mark_healthy()
+            print(f"✅ Created work pool: '{self.work_pool_name}'")
+            return True
 
         except Exception as e:
             print(f"⚠️  Could not create work pool: {e}")
             print(f"   You may need to create it manually via the UI")
             return False
 
-    async def setup_concurrency_limit(self) -> bool:
+    async def setup_concurrency_limit(self, client: PrefectClient) -> bool:
         """Set up server-side concurrency limits."""
         print(f"\n🔧 Setting up concurrency limit...")
 
         try:
-            async with get_client() as client:
-                # Check if limit already exists
-                try:
-                    limits = await client.read_concurrency_limits()
-                    existing_tags = [limit.tag for limit in limits]
-
-                    if self.concurrency_tag in existing_tags:
-                        print(
-                            f"✅ Concurrency limit for '{self.concurrency_tag}' already exists"
-                        )
-                        return True
-                except Exception:
-                    pass
-
-                # Create concurrency limit
-                await client.create_concurrency_limit(
-                    tag=self.concurrency_tag, concurrency_limit=self.concurrency_limit
-                )
-                print(f"✅ Created concurrency limit:")
-                print(f"   Tag: '{self.concurrency_tag}'")
-                print(f"   Max concurrent: {self.concurrency_limit}")
+            # Check if limit already exists (looked up by its tag)
+            try:
+                await client.read_concurrency_limit_by_tag(self.concurrency_tag)
+                self._mark_healthy()
                 print(
-                    f"   Tasks with tag '{self.concurrency_tag}' will be limited to {self.concurrency_limit} concurrent runs"
+                    f"✅ Concurrency limit for '{self.concurrency_tag}' already exists"
                 )
                 return True
+            except ObjectNotFound:
+                pass
+
+            # Create concurrency limit
+            await client.create_concurrency_limit(
+                tag=self.concurrency_tag, concurrency_limit=self.concurrency_limit
+            )
+            self._mark_healthy()
+            print(f"✅ Created concurrency limit:")
+            print(f"   Tag: '{self.concurrency_tag}'")
+            print(f"   Max concurrent: {self.concurrency_limit}")
+            print(
+                f"   Tasks with tag '{self.concurrency_tag}' will be limited to {self.concurrency_limit} concurrent runs"
+            )
+            return True
 
         except Exception as e:
             print(f"❌ Error setting up concurrency limit: {e}")
             return False
 
-    async def verify_setup(self) -> bool:
+    async def verify_setup(self, client: PrefectClient) -> bool:
         """Verify that everything is configured correctly."""
         print(f"\n🔍 Verifying setup...")
 
         all_good = True
 
         try:
-            async with get_client() as client:
-                # Check flows endpoint
+            # Check flows endpoint, unless an API call just succeeded
+            if self._recently_healthy():
+                print(f"✅ Can connect to Prefect API")
+            else:
                 try:
                     flows = await client.read_flows(limit=1)
+                    self._mark_healthy()
                     print(f"✅ Can connect to Prefect API")
                 except Exception as e:
                     print(f"❌ Cannot connect to Prefect API: {e}")
                     all_good = False
 
-                # Check work pools
-                try:
-                    pools = await client.read_work_pools()
-                    pool_names = [pool.name for pool in pools]
-                    if self.work_pool_name in pool_names:
-                        print(f"✅ Work pool '{self.work_pool_name}' exists")
-                    else:
-                        print(f"⚠️  Work pool '{self.work_pool_name}' not found")
-                        all_good = False
-                except Exception as e:
-                    print(f"⚠️  Could not verify work pools: {e}")
-
-                # Check concurrency limits
-                try:
-                    limits = await client.read_concurrency_limits()
-                    limit_tags = [limit.tag for limit in limits]
-                    if self.concurrency_tag in limit_tags:
-                        print(
-                            f"✅ Concurrency limit for '{self.concurrency_tag}' exists"
-                        )
-                    else:
-                        print(
-                            f"❌ Concurrency limit for '{self.concurrency_tag}' not found"
-                        )
-                        all_good = False
-                except Exception as e:
-                    print(f"❌ Could not verify concurrency limits: {e}")
-                    all_good = False
+            # Check work pools
+            try:
+                await client.read_work_pool(self.work_pool_name)
+                print(f"✅ Work pool '{self.work_pool_name}' exists")
+            except ObjectNotFound:
+                print(f"⚠️  Work pool '{self.work_pool_name}' not found")
+                all_good = False
+            except Exception as e:
+                print(f"⚠️  Could not verify work pools: {e}")
+
+            # Check concurrency limits
+            try:
+                await client.read_concurrency_limit_by_tag(self.concurrency_tag)
+                print(f"✅ Concurrency limit for '{self.concurrency_tag}' exists")
+            except ObjectNotFound:
+                print(
+                    f"❌ Concurrency limit for '{self.concurrency_tag}' not found"
+                )
+                all_good = False
+            except Exception as e:
+                print(f"❌ Could not verify concurrency limits: {e}")
+                all_good = False
 
         except Exception as e:
             print(f"❌ Error during verification: {e}")
@@ -344,17 +368,20 @@ class PrefectServerSetup:
                 print(f"   Or set PREFECT_START_SERVER=native to auto-start")
                 return False
 
-        # Step 2: Create work pool
-        print(f"\n2️⃣  Setting up work pool...")
-        await self.create_work_pool()
-
-        # Step 3: Setup concurrency limits
-        print(f"\n3️⃣  Configuring concurrency limits...")
-        await self.setup_concurrency_limit()
+        # One client (and connection pool) for all of the API steps below
+        async with get_client() as client:
+            # Steps 2 and 3: Create work pool and concurrency limit. They touch
+            # unrelated objects, so run them concurrently
+            print(f"\n2️⃣  Setting up work pool...")
+            print(f"\n3️⃣  Configuring concurrency limits...")
+            await asyncio.gather(
+                self.create_work_pool(client),
+                self.setup_concurrency_limit(client),
+            )
 
-        # Step 4: Verify everything
-        print(f"\n4️⃣  Verification...")
-        verification_passed = await self.verify_setup()
+            # Step 4: Verify everything
+            print(f"\n4️⃣  Verification...")
+            verification_passed = await self.verify_setup(client)
 
         # Summary
         print("\n" + "=" * 60)
@@ -415,10 +442,18 @@ def main():
     if not is_local and not api_key:
         print("\n⚠️  WARNING: Production URL detected but PREFECT_API_KEY is not set!")
         print("   Set it with: export PREFECT_API_KEY=pnu_your_key")
-        response = input("\n   Continue anyway? (y/n): ")
-        if response.lower() != "y":
-            print("   Aborted.")
-            sys.exit(1)
+        # PREFECT_TEST_YES answers yes up front. Otherwise ask on an
+        # interactive terminal, and abort scripted runs (no TTY) rather than
+        # configure production without confirmation
+        if not os.getenv("PREFECT_TEST_YES"):
+            if not sys.stdin.isatty():
+                print("   Aborted: no terminal to confirm on.")
+                print("   Set PREFECT_TEST_YES=1 to continue without confirmation.")
+                sys.exit(1)
+            response = input("\n   Continue anyway? (y/n): ")
+            if response.lower() != "y":
+                print("   Aborted.")
+                sys.exit(1)
 
     print("\n" + "=" * 60)
     print("")
@@ -426,6 +461,8 @@ def main():
     # Create setup instance and run
     setup = PrefectServerSetup()
 
+    install_uvloop()
+
     try:
         success = asyncio.run(setup.setup())
         sys.exit(0 if success else 1)
@@ -438,6 +475,8 @@ def main():
 
         traceback.print_exc()
         sys.exit(1)
+    finally:
+        setup.close()
 
 
 if __name__ == "__main__":
@@ -17,13 +17,35 @@ Usage:
     python scripts/start_workers.py --pool my-pool --workers 3
 """
 
+import asyncio
+import multiprocessing
 import os
 import sys
-import subprocess
-import signal
 import time
+from datetime import datetime, timezone
+
+import httpx
+from prefect.client.orchestration import get_client
+from prefect.exceptions import ObjectNotFound
 from prefect.settings import PREFECT_API_URL, PREFECT_API_KEY
 
+# Workers are forked from a server process that has already imported the
+# Prefect CLI, so each one skips Prefect's (slow) import and shares those
+# module pages copy-on-write, instead of each being a fresh `prefect`
+# interpreter. forkserver is POSIX-only; Windows falls back to spawn.
+if "forkserver" in multiprocessing.get_all_start_methods():
+    _mp = multiprocessing.get_context("forkserver")
+    _mp.set_forkserver_preload(["__main__", "prefect.cli"])
+else:
+    _mp = multiprocessing.get_context("spawn")
+
+
+def run_worker(pool_name: str, worker_name: str):
+    """Run `prefect worker start` inside this (worker) process."""
+    from prefect.cli import app
+
+    app(["worker", "start", "--pool", pool_name, "--name", worker_name])
+
 
 def start_worker(pool_name: str, worker_id: int = 1):
     """Start a single Prefect worker process."""
@@ -32,17 +54,93 @@ def start_worker(pool_name: str, worker_id: int = 1):
     print(f"🚀 Starting worker: {worker_name}")
     print(f"   Pool: {pool_name}")
 
-    cmd = ["prefect", "worker", "start", "--pool", pool_name, "--name", worker_name]
-
     # Start worker process
-    process = subprocess.Popen(
-        cmd, stdout=subprocess.PIPE, stderr=subprocess.STDOUT, text=True, bufsize=1
+    process = _mp.Process(
+        target=run_worker, args=(pool_name, worker_name), name=worker_name
     )
+    process.start()
 
     print(f"✅ Worker {worker_name} started (PID: {process.pid})")
     return process
 
 
+async def wait_for_workers_ready(
+    pool_name: str, worker_names: list, launched_at: datetime, max_wait: float = 60
+) -> set:
+    """
+    Wait until the named workers have registered with the work pool.
+
+    Workers register on their first heartbeat, so the pool's worker list is
+    polled, quickly at first and then backing off (doubling, capped at 1s).
+    A worker only counts once it has heartbeated since launched_at: rows
+    left on the server by earlier runs with the same names don't.
+    Returns the names that registered within max_wait seconds.
+    """
+    pending = set(worker_names)
+    deadline = time.time() + max_wait
+    delay = 0.05
+    async with get_client() as client:
+        while pending and time.time() < deadline:
+            try:
+                workers = await client.read_workers_for_work_pool(pool_name)
+                pending -= {
+                    worker.name
+                    for worker in workers
+                    if worker.last_heartbeat_time
+                    and worker.last_heartbeat_time >= launched_at
+                }
+            except (httpx.TransportError, ObjectNotFound) as e:
+                # Server still unreachable, or the pool not visible yet
+                print(f"   ⏳ Workers not registered yet: {e!r}")
+            if pending:
+                await asyncio.sleep(delay)
+                delay = min(delay * 2, 1.0)
+    return set(worker_names) - pending
+
+
+async def monitor_workers(pool_name: str, processes: list) -> None:
+    """
+    Restart workers as soon as they exit, until interrupted (Ctrl+C).
+
+    Each worker's process sentinel is watched on the event loop, so an exit
+    is seen (and the worker replaced) immediately, with no timer wake-ups in
+    between. This also covers forkserver children, which are not children of
+    this process and so raise no SIGCHLD here. Where the loop can't watch the
+    sentinels (Windows), fall back to checking every 5 seconds.
+    """
+    loop = asyncio.get_running_loop()
+
+    def watch(i):
+        loop.add_reader(processes[i - 1].sentinel, on_exit, i)
+
+    def on_exit(i):
+        process = processes[i - 1]
+        loop.remove_reader(process.sentinel)
+        process.join()
+        print(
+            f"⚠️  Worker {i} (PID: {process.pid}) exited with code {process.exitcode}"
+        )
+        print(f"   Restarting worker {i}...")
+        processes[i - 1] = start_worker(pool_name, i)
+        watch(i)
+
+    try:
+        for i in range(1, len(processes) + 1):
+            watch(i)
+    except NotImplementedError:
+        while True:
+            for i, process in enumerate(processes, 1):
+                if not process.is_alive():
+                    print(
+                        f"⚠️  Worker {i} (PID: {process.pid}) exited with code {process.exitcode}"
+                    )
+                    print(f"   Restarting worker {i}...")
+                    processes[i - 1] = start_worker(pool_name, i)
+            await asyncio.sleep(5)
+
+    await asyncio.Event().wait()
+
+
 def main():
     """Main entry point."""
     import argparse
@@ -85,34 +183,35 @@ def main():
     processes = []
 
     try:
+        # Launch all workers at once, then wait for them to register, instead
+        # of pacing the launches with a fixed delay
+        launched_at = datetime.now(timezone.utc)
         for i in range(1, args.workers + 1):
             process = start_worker(args.pool, i)
             processes.append(process)
-            time.sleep(1)  # Stagger startup
+
+        worker_names = [f"worker-{i}" for i in range(1, args.workers + 1)]
+        print(f"\n⏳ Waiting for workers to register with '{args.pool}'...")
+        ready = asyncio.run(
+            wait_for_workers_ready(args.pool, worker_names, launched_at)
+        )
 
         print()
         print("=" * 70)
-        print(f"✅ All {args.workers} worker(s) started successfully!")
+        if len(ready) == len(worker_names):
+            print(f"✅ All {args.workers} worker(s) started successfully!")
+        else:
+            missing = ", ".join(n for n in worker_names if n not in ready)
+            print(f"⚠️  {len(ready)}/{args.workers} worker(s) registered")
+            print(f"   Not registered yet: {missing}")
         print("=" * 70)
         print()
         print("💡 Workers are now polling for flow runs...")
         print("   Press Ctrl+C to stop all workers")
         print()
 
-        # Monitor workers
-        while True:
-            time.sleep(5)
-
-            # Check if any workers died
-            for i, process in enumerate(processes, 1):
-                if process.poll() is not None:
-                    print(
-                        f"⚠️  Worker {i} (PID: {process.pid}) exited with code {process.returncode}"
-                    )
-                    # Optionally restart
-                    print(f"   Restarting worker {i}...")
-                    new_process = start_worker(args.pool, i)
-                    processes[i - 1] = new_process
+        # Monitor workers (restarting any that die) until Ctrl+C
+        asyncio.run(monitor_workers(args.pool, processes))
 
     except KeyboardInterrupt:
         print("\n\n⚠️  Shutting down workers...")
@@ -125,7 +224,7 @@ def main():
 
         # Force kill if needed
         for process in processes:
-            if process.poll() is None:
+            if process.is_alive():
                 process.kill()
 
         print("✅ All workers stopped")
@@ -135,7 +234,7 @@ def main():
         print(f"\n❌ Error: {e}")
         # Stop all workers
         for process in processes:
-            if process.poll() is None:
+            if process.is_alive():
                 process.terminate()
         sys.exit(1)
 
@@ -0,0 +1,57 @@
+"""
+A single asyncio event loop that outlives Streamlit reruns.
+
+Each rerun executes the script from the top, so `asyncio.run()` would give
+every rerun a fresh loop. Async clients (httpx connection pools) are bound to
+the loop they were opened on, so clients cached across reruns with
+`st.cache_resource` must always be driven from the same loop: this one, which
+runs forever in a daemon thread.
+"""
+
+import asyncio
+import concurrent.futures
+import threading
+from typing import Any, Coroutine, TypeVar
+
+import streamlit as st
+
+T = TypeVar("T")
+
+
+@st.cache_resource
+def get_event_loop() -> asyncio.AbstractEventLoop:
+    """
+    Start the shared event loop in a background thread (once per process).
+
+    Uses uvloop's loop when it's installed, for cheaper I/O and callbacks in
+    the concurrent API fetches.
+    """
+    try:
+        import uvloop
+    except ImportError:
+        loop = asyncio.new_event_loop()
+    else:
+        loop = uvloop.new_event_loop()
+    threading.Thread(
+        target=loop.run_forever, name="streamlit-async-loop", daemon=True
+    ).start()
+    return loop
+
+
+def submit_async(coro: Coroutine[Any, Any, T]) -> concurrent.futures.Future[T]:
+    """
+    Start a coroutine on the shared event loop without waiting for it.
+
+    The returned future can be waited on from the script thread later, so the
+    page keeps rendering while the coroutine's I/O is in flight.
+    """
+    return asyncio.run_coroutine_threadsafe(coro, get_event_loop())
+
+
+def run_async(coro: Coroutine[Any, Any, T]) -> T:
+    """
+    Run a coroutine on the shared event loop and block until it finishes.
+
+    Must not be called from code already running on that loop.
+    """
+    return submit_async(coro).result()
@@ -0,0 +1,21 @@
+"""
+Records cached across Streamlit reruns.
+
+The app script runs as `__main__` and is re-executed on every rerun, so a
+class defined there is redefined each time. Pickling an instance (as the disk
+cache does, possibly from a background thread) fails if the rerun replaced its
+class in the meantime. Classes defined in this module are imported once per
+process and stay picklable.
+"""
+
+from typing import NamedTuple, Optional
+
+
+class RunRecord(NamedTuple):
+    """The rendered fields of a flow run, with its state flattened in."""
+
+    flow_id: str
+    start_time: Optional[str]
+    state_name: str
+    state_timestamp: Optional[str]
+    state_message: str
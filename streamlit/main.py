@@ -1,51 +1,172 @@
 import os
+import time
 import asyncio
+from collections import defaultdict
+from contextvars import ContextVar
 from datetime import datetime, timedelta, timezone
+from typing import Optional
 import pandas as pd
 import streamlit as st
-import requests
+import httpx
 
 from prefect.client.orchestration import PrefectClient
 from prefect.client.schemas.filters import FlowFilter
 
+from _loop import run_async
+
+# Largest `limit` the Prefect API accepts per request (PREFECT_API_DEFAULT_LIMIT)
+API_PAGE_SIZE = 200
+
+
+# Assumed lifetime of a workbench login session, and how long before expiry
+# a cached cookie is treated as stale
+COOKIE_TTL_SECONDS = 3300
+COOKIE_REFRESH_MARGIN_SECONDS = 30
+
 
 # --- Session-based authentication template ---
-def get_authenticated_cookie(login_url, username, password):
-    session = requests.Session()
+@st.cache_resource
+def get_login_client():
+    """
+    One httpx.AsyncClient per app process, so logins reuse its connection pool.
+    Only ever used on the shared event loop (see _loop.run_async).
+    """
+    return httpx.AsyncClient(follow_redirects=True)
+
+
+async def get_authenticated_cookie(login_url, username, password):
+    client = get_login_client()
     payload = {"username": username, "password": password}
-    resp = session.post(login_url, data=payload)
+    resp = await client.post(login_url, data=payload)
     resp.raise_for_status()
-    # Extract all cookies as a single string for the Cookie header
-    cookies = session.cookies.get_dict()
+    # Extract the cookies set during this login (including any redirects) as a
+    # single string for the Cookie header. The shared client's jar is cleared
+    # so one user's cookies are never sent with another user's login.
+    cookies = {}
+    for r in (*resp.history, resp):
+        cookies.update(r.cookies.items())
+    client.cookies.clear()
     cookie_str = "; ".join([f"{k}={v}" for k, v in cookies.items()])
     return cookie_str
 
 
-async def get_recent_flows(limit=50, run_history=5, api_url=None, cookie=None):
+def get_cached_cookie(login_url, username, password, force_refresh=False):
+    """
+    Return the login cookie from st.session_state, logging in again only when
+    there is none for this (login_url, username), it is about to expire, or
+    force_refresh is set (e.g. after a 401).
+    """
+    key = (login_url, username)
+    cached = st.session_state.get("cookie_cache")
+    if (
+        not force_refresh
+        and cached
+        and cached["key"] == key
+        and time.time() < cached["exp"] - COOKIE_REFRESH_MARGIN_SECONDS
+    ):
+        return cached["cookie"]
+
+    cookie = run_async(get_authenticated_cookie(login_url, username, password))
+    st.session_state["cookie_cache"] = {
+        "key": key,
+        "cookie": cookie,
+        "exp": time.time() + COOKIE_TTL_SECONDS,
+    }
+    return cookie
+
+
+# Cookie for the API requests made by the current coroutine (and the tasks
+# it gathers); set by get_recent_flows, read by the client's request hook
+_REQUEST_COOKIE: ContextVar[Optional[str]] = ContextVar("request_cookie", default=None)
+
+
+async def _send_request_cookie(request):
+    """httpx request hook: send the current login cookie, and only that."""
+    cookie = _REQUEST_COOKIE.get()
+    if cookie:
+        request.headers["Cookie"] = cookie
+    else:
+        request.headers.pop("Cookie", None)
+
+
+@st.cache_resource
+def get_prefect_client(api_url):
+    """
+    One open PrefectClient per api_url, reused across reruns so its httpx
+    connection pool survives the 10-second auto-refresh.
+    Opened on the shared event loop, where every request on it must run.
+
+    The login cookie is not baked into the client: it is attached to each
+    request from _REQUEST_COOKIE, so a re-login reuses the same client
+    instead of opening (and leaking) a new one per cookie.
+    """
     client = PrefectClient(
         api=api_url or "http://localhost:4200/api",
-        httpx_settings={"headers": {"Cookie": cookie} if cookie else {}},
+        httpx_settings={"event_hooks": {"request": [_send_request_cookie]}},
     )
+    run_async(client.__aenter__())
+    return client
+
+
+async def get_recent_flows(client, cookie=None, limit=50, run_history=5):
+    _REQUEST_COOKIE.set(cookie)
     flows = await client.read_flows(limit=limit)
-    data = []
-    for f in flows:
-        flow_runs = await client.read_flow_runs(
-            flow_filter=FlowFilter(id={"any_": [str(f.id)]}),
-            limit=run_history,
-            sort="START_TIME_DESC",
+
+    # Fetch recent runs for all flows with one filtered query, then group them
+    # per flow. The overall cap is limit * run_history, so a very busy flow can
+    # push older runs of quieter flows out of the window. The server rejects
+    # limits above API_PAGE_SIZE, so larger caps are read as concurrent pages.
+    flow_filter = FlowFilter(id={"any_": [str(f.id) for f in flows]})
+    total = limit * run_history
+    pages = await asyncio.gather(
+        *(
+            client.read_flow_runs(
+                flow_filter=flow_filter,
+                limit=min(API_PAGE_SIZE, total - offset),
+                offset=offset,
+                sort="START_TIME_DESC",
+            )
+            for offset in range(0, total, API_PAGE_SIZE)
         )
+    )
+    runs_by_flow = defaultdict(list)
+    for page in pages:
+        for run in page:
+            runs_by_flow[run.flow_id].append(run)
+
+    # Build the table column by column (one list per column), which pandas
+    # takes as-is instead of inferring columns from a list of row dicts
+    names, ids, created, states, starts = [], [], [], [], []
+    for f in flows:
+        flow_runs = runs_by_flow[f.id][:run_history]
         run_states = [getattr(run.state, "name", None) for run in flow_runs]
-        run_starts = [str(getattr(run, "start_time", None)) for run in flow_runs]
-        data.append(
-            {
-                "Flow Name": f.name,
-                "Flow ID": str(f.id),
-                "Created": str(getattr(f, "created", "")),
-                "Recent Run States": ", ".join([s for s in run_states if s]),
-                "Recent Run Starts": ", ".join([s for s in run_starts if s]),
-            }
-        )
-    return pd.DataFrame(data)
+        run_starts = [str(run.start_time) for run in flow_runs if run.start_time]
+        names.append(f.name)
+        ids.append(str(f.id))
+        created.append(str(getattr(f, "created", "")))
+        states.append(", ".join([s for s in run_states if s]))
+        starts.append(", ".join(run_starts))
+    return pd.DataFrame(
+        {
+            "Flow Name": names,
+            "Flow ID": ids,
+            "Created": created,
+            "Recent Run States": states,
+            "Recent Run Starts": starts,
+        },
+        copy=False,
+    )
+
+
+@st.cache_data(ttl=10)
+def fetch_flows_cached(api_url, cookie, limit, run_history):
+    """
+    The flows table for these settings, cached for 10 seconds (the auto-refresh
+    interval), so reruns from widget interactions skip the API round-trips.
+    Keyed on the cookie too, so a re-login always fetches fresh data.
+    """
+    client = get_prefect_client(api_url)
+    return run_async(get_recent_flows(client, cookie, limit, run_history))
 
 
 def main():
@@ -70,8 +191,18 @@ def main():
                         "WORKBENCH_USERNAME and WORKBENCH_PASSWORD environment variables must be set."
                     )
                     return
-                cookie = get_authenticated_cookie(login_url, username, password)
-                df = asyncio.run(get_recent_flows(limit, run_history, api_url, cookie))
+                cookie = get_cached_cookie(login_url, username, password)
+                try:
+                    df = fetch_flows_cached(api_url, cookie, limit, run_history)
+                except httpx.HTTPStatusError as e:
+                    if e.response.status_code != 401:
+                        raise
+                    # Session expired early; log in again and retry once with
+                    # the new cookie (the open client is reused)
+                    cookie = get_cached_cookie(
+                        login_url, username, password, force_refresh=True
+                    )
+                    df = fetch_flows_cached(api_url, cookie, limit, run_history)
                 if df.empty:
                     st.info("No flows found.")
                 else:
@@ -1,33 +1,379 @@
+import asyncio
+import concurrent.futures
+import functools
+import html
 import os
-import requests
+import diskcache
+import httpx
+import orjson
 import pandas as pd
 import streamlit as st
+from collections import defaultdict
 from datetime import datetime, timezone
+from dateutil.tz import tzlocal
 
+from _loop import run_async, submit_async
+from _records import RunRecord
 
-def get_authenticated_session(login_url, username, password):
-    session = requests.Session()
+# Number of API requests in flight at once; the client's connection pool is
+# sized to match so concurrent requests don't queue for a connection
+FETCH_WORKERS = 16
+
+# Largest `limit` the Prefect API accepts per request (PREFECT_API_DEFAULT_LIMIT)
+API_PAGE_SIZE = 200
+
+# Where API results are cached on disk, and for how long (seconds)
+DISK_CACHE_DIR = os.getenv("PREFECT_POC_CACHE_DIR", "prefect_cache")
+FLOWS_CACHE_SECONDS = 300
+RUNS_CACHE_SECONDS = 15
+
+# Transient gateway errors are retried with exponential backoff
+RETRY_STATUSES = (502, 503, 504)
+MAX_RETRIES = 3
+RETRY_BACKOFF_SECONDS = 0.3
+
+
+@st.cache_resource
+def get_authenticated_client(login_url, username, password):
+    """
+    Log in once and reuse the client (cookies and connection pool) across
+    reruns, until the server rejects the session (see relogin()).
+    Opened on the shared event loop, where every request on it must run.
+
+    HTTP/2 lets the concurrent filter requests share one multiplexed
+    connection per host; servers without it are spoken to over HTTP/1.1.
+    """
+    client = httpx.AsyncClient(
+        http2=True,
+        follow_redirects=True,
+        limits=httpx.Limits(
+            max_connections=FETCH_WORKERS, max_keepalive_connections=FETCH_WORKERS
+        ),
+    )
     payload = {"username": username, "password": password}
-    resp = session.post(login_url, data=payload)
-    resp.raise_for_status()
-    return session
+    try:
+        run_async(post_with_retries(client, login_url, data=payload))
+    except Exception:
+        run_async(client.aclose())
+        raise
+    return client
+
 
+def relogin(client, login_url, username, password):
+    """
+    Replace a client whose session the server rejected with a 401: drop it
+    from the cache, close its connections and log in again on a new one.
+    """
+    get_authenticated_client.clear()
+    run_async(client.aclose())
+    return get_authenticated_client(login_url, username, password)
 
-def fetch_flows(api_url, session):
-    resp = session.post(f"{api_url}/flows/filter", json={})
+
+async def post_with_retries(client, url, **kwargs):
+    """
+    POST, retrying RETRY_STATUSES up to MAX_RETRIES times with backoff. Safe
+    for these POSTs: the login and the read-only /filter queries.
+    """
+    for attempt in range(MAX_RETRIES + 1):
+        resp = await client.post(url, **kwargs)
+        if resp.status_code not in RETRY_STATUSES or attempt == MAX_RETRIES:
+            break
+        await asyncio.sleep(RETRY_BACKOFF_SECONDS * 2**attempt)
     resp.raise_for_status()
-    return resp.json()
+    return resp
+
+
+# The only fields the page renders. The Prefect API has no field projection,
+# so responses are trimmed to these right after decoding, before they are
+# grouped and stored by st.cache_data
+FLOW_FIELDS = ("id", "name", "created")
+
 
+def to_run_record(run):
+    """Convert a decoded flow run to a RunRecord, dropping everything else."""
+    state = run.get("state") or {}
+    return RunRecord(
+        flow_id=run["flow_id"],
+        start_time=run.get("start_time"),
+        state_name=state.get("name") or "",
+        state_timestamp=state.get("timestamp"),
+        state_message=state.get("message") or "",
+    )
 
-def fetch_flow_runs(api_url, session, flow_id, limit=5):
+
+async def read_flows(api_url, client):
+    resp = await post_with_retries(client, f"{api_url}/flows/filter", json={})
+    return [
+        {key: flow[key] for key in FLOW_FIELDS if key in flow}
+        for flow in orjson.loads(resp.content)
+    ]
+
+
+async def read_flow_runs(api_url, client, flow_ids, limit=5, offset=0):
     body = {
-        "flow_runs": {"flow_id": {"any_": [flow_id]}},
+        "flows": {"id": {"any_": flow_ids}},
         "limit": limit,
+        "offset": offset,
         "sort": "START_TIME_DESC",
     }
-    resp = session.post(f"{api_url}/flow_runs/filter", json=body)
-    resp.raise_for_status()
-    return resp.json()
+    resp = await post_with_retries(client, f"{api_url}/flow_runs/filter", json=body)
+    return [to_run_record(run) for run in orjson.loads(resp.content)]
+
+
+async def read_recent_runs(api_url, client, flow_ids, run_history=5):
+    """
+    Recent runs for all flows in one filtered query, grouped by flow ID and
+    trimmed to run_history each.
+
+    The overall cap is run_history per flow, so a very busy flow can push
+    older runs of quieter flows out of the window. Caps above API_PAGE_SIZE
+    are read as concurrent pages.
+    """
+    total = run_history * len(flow_ids)
+    pages = await asyncio.gather(
+        *(
+            read_flow_runs(
+                api_url,
+                client,
+                flow_ids,
+                min(API_PAGE_SIZE, total - offset),
+                offset,
+            )
+            for offset in range(0, total, API_PAGE_SIZE)
+        )
+    )
+    runs_by_flow = defaultdict(list)
+    for page in pages:
+        for run in page:
+            runs_by_flow[run.flow_id].append(run)
+    return {flow_id: runs[:run_history] for flow_id, runs in runs_by_flow.items()}
+
+
+@st.cache_resource
+def get_disk_cache():
+    """
+    API results cached on disk, shared across sessions and app restarts on
+    this machine. The flow list changes slowly, so it is kept for longer than
+    run history.
+    """
+    return diskcache.Cache(DISK_CACHE_DIR)
+
+
+def disk_cached(key, expire, load):
+    """Return the disk-cached value for key, calling load() on a miss."""
+    cache = get_disk_cache()
+    value = cache.get(key)
+    if value is None:
+        value = load()
+        cache.set(key, value, expire=expire)
+    return value
+
+
+@st.cache_data(ttl=60)
+def fetch_flows(api_url, _client):
+    return disk_cached(
+        ("flows", api_url),
+        FLOWS_CACHE_SECONDS,
+        lambda: run_async(read_flows(api_url, _client)),
+    )
+
+
+def prefetch_recent_runs(api_url, client, flow_ids, run_history=5):
+    """
+    Start read_recent_runs() in the background and return a Future for its
+    result, so the caller can render while the request is in flight.
+
+    Served from the disk cache, keyed per (api_url, flow_ids, run_history),
+    while fresh; otherwise the fetched result is cached when it arrives.
+    """
+    cache = get_disk_cache()
+    key = ("flow_runs", api_url, tuple(flow_ids), run_history)
+    cached = cache.get(key)
+    if cached is not None:
+        future = concurrent.futures.Future()
+        future.set_result(cached)
+        return future
+
+    def store(done):
+        if done.exception() is None:
+            cache.set(key, done.result(), expire=RUNS_CACHE_SECONDS)
+
+    future = submit_async(read_recent_runs(api_url, client, flow_ids, run_history))
+    future.add_done_callback(store)
+    return future
+
+
+_BADGE_COLORS = {
+    "Completed": "#4BB543",  # green
+    "Running": "#007bff",  # blue
+    "Failed": "#d9534f",  # red
+    "Cancelled": "#f0ad4e",  # orange
+    "Pending": "#6c757d",  # gray
+}
+
+
+@functools.lru_cache(maxsize=64)
+def state_badge(name: str) -> str:
+    color = _BADGE_COLORS.get(name, "#6c757d")
+    return f'<span style="background-color:{color};color:white;padding:2px 8px;border-radius:8px;">{html.escape(name)}</span>'
+
+
+# Badges for the common states, built once; other names go through the
+# memoized state_badge()
+_BADGE_HTML = {name: state_badge(name) for name in _BADGE_COLORS}
+
+
+# Local timezone and display format, resolved once instead of per timestamp.
+# tzlocal() follows the system zone's DST rules for each timestamp, unlike a
+# fixed offset taken at startup
+_LOCAL_TZ = tzlocal()
+_TIMESTAMP_FORMAT = "%d-%m-%Y %H:%M:%S"
+
+
+def format_timestamp(timestamp_raw):
+    """Format one ISO timestamp in local time, or return it as-is if unparseable."""
+    if not timestamp_raw:
+        return ""
+    if timestamp_raw.endswith("Z"):
+        timestamp_raw = timestamp_raw[:-1] + "+00:00"
+    try:
+        dt = datetime.fromisoformat(timestamp_raw)
+    except ValueError:
+        # Rare malformed offsets like "+00.00"; anything else is shown raw
+        try:
+            dt = datetime.fromisoformat(timestamp_raw.replace("+00.00", "+00:00"))
+        except ValueError:
+            return timestamp_raw
+    if dt.tzinfo is None:
+        dt = dt.replace(tzinfo=timezone.utc)
+    return dt.astimezone(_LOCAL_TZ).strftime(_TIMESTAMP_FORMAT)
+
+
+def format_timestamps(raw_timestamps):
+    """
+    Format ISO timestamps in local time with one vectorized pandas pass.
+    Values pandas can't parse fall back to format_timestamp() one by one.
+    """
+    if not raw_timestamps:
+        return []
+    # format="ISO8601" accepts any ISO 8601 variant per value; an inferred
+    # format would come from the first element and turn timestamps with a
+    # different fractional-second precision into NaT
+    parsed = pd.to_datetime(
+        pd.Series(raw_timestamps, dtype="object"),
+        utc=True,
+        errors="coerce",
+        format="ISO8601",
+    )
+    formatted = parsed.dt.tz_convert(_LOCAL_TZ).dt.strftime(_TIMESTAMP_FORMAT)
+    return [
+        value if isinstance(value, str) else format_timestamp(raw)
+        for value, raw in zip(formatted.tolist(), raw_timestamps)
+    ]
+
+
+_TD_OPEN = "<td style='padding:6px;border-bottom:1px solid #eee'>"
+
+
+@functools.lru_cache(maxsize=8)
+def table_open(cols):
+    """The <table> tag and header row for these columns, built once per schema."""
+    header = "".join(
+        f"<th style='border-bottom:1px solid #ddd;padding:6px;text-align:left'>{col}</th>"
+        for col in cols
+    )
+    return f"<table style='width:100%;border-collapse:collapse;'><tr>{header}</tr>"
+
+
+def render_rows(rows, cols=("State", "Timestamp", "Message")):
+    """Render row dicts as an HTML table, building the markup in one join."""
+    parts = [table_open(cols)]
+    for row in rows:
+        parts.append("<tr>")
+        parts.extend(f"{_TD_OPEN}{row[col]}</td>" for col in cols)
+        parts.append("</tr>")
+    parts.append("</table>")
+    st.markdown("".join(parts), unsafe_allow_html=True)
+
+
+@st.fragment
+def render_flows(api_url, login, flows):
+    """
+    The run-history slider and one expander per flow. As a fragment, moving
+    the slider reruns only this part, not the login and flow listing.
+
+    Takes the login (url, username, password) rather than a client, so a
+    fragment rerun picks up the client of any re-login since the full run.
+    """
+    run_history = st.slider("Number of recent runs per flow", 1, 10, 5)
+
+    try:
+        # Start fetching the runs of every flow at once (instead of one
+        # request per flow), and lay out each flow's expander while the
+        # request is in flight; the run tables are filled in afterwards
+        client = get_authenticated_client(*login)
+        flow_ids = [f.get("id") for f in flows]
+        runs_future = prefetch_recent_runs(api_url, client, flow_ids, run_history)
+
+        table_slots = []
+        for f in flows:
+            with st.expander(f"Flow: {f.get('name')}"):
+                st.markdown(f"**Flow ID:** {f.get('id')}")
+                st.markdown(f"**Created:** {str(f.get('created', ''))}")
+                table_slots.append(st.empty())
+
+        try:
+            runs_by_flow = runs_future.result()
+        except httpx.HTTPStatusError as e:
+            if e.response.status_code != 401:
+                raise
+            # Session expired or revoked; log in again and retry once
+            client = relogin(client, *login)
+            runs_by_flow = prefetch_recent_runs(
+                api_url, client, flow_ids, run_history
+            ).result()
+
+        # Format every run's timestamp in one vectorized pass, then split
+        # the results back out per flow
+        formatted = iter(
+            format_timestamps(
+                [
+                    run.state_timestamp or run.start_time
+                    for runs in runs_by_flow.values()
+                    for run in runs
+                ]
+            )
+        )
+        timestamps_by_flow = {
+            flow_id: [next(formatted) for _ in runs]
+            for flow_id, runs in runs_by_flow.items()
+        }
+
+        for f, slot in zip(flows, table_slots):
+            flow_id = f.get("id")
+            flow_runs = runs_by_flow.get(flow_id, [])
+            with slot.container():
+                if not flow_runs:
+                    st.info("No recent runs found.")
+                else:
+                    run_table = []
+                    for run, timestamp_fmt in zip(
+                        flow_runs, timestamps_by_flow[flow_id]
+                    ):
+                        name = run.state_name
+                        # State is trusted badge HTML; the other cells are
+                        # API text, escaped once here so render_rows can
+                        # insert every cell as-is
+                        run_table.append(
+                            {
+                                "State": _BADGE_HTML.get(name) or state_badge(name),
+                                "Timestamp": html.escape(timestamp_fmt),
+                                "Message": html.escape(run.state_message),
+                            }
+                        )
+                    render_rows(run_table)
+    except Exception as e:
+        st.error(f"Error: {e}")
 
 
 def main():
@@ -37,7 +383,6 @@ def main():
     username = os.environ.get("WORKBENCH_USERNAME", "")
     password = os.environ.get("WORKBENCH_PASSWORD", "")
     limit = st.slider("Number of flows", 10, 200, 50)
-    run_history = st.slider("Number of recent runs per flow", 1, 10, 5)
 
     with st.spinner("Authenticating and loading flows…"):
         try:
@@ -46,91 +391,21 @@ def main():
                     "WORKBENCH_USERNAME and WORKBENCH_PASSWORD environment variables must be set."
                 )
                 return
-            session = get_authenticated_session(login_url, username, password)
-            flows = fetch_flows(api_url, session)
-
-            def state_badge(name: str) -> str:
-                color_map = {
-                    "Completed": "#4BB543",  # green
-                    "Running": "#007bff",  # blue
-                    "Failed": "#d9534f",  # red
-                    "Cancelled": "#f0ad4e",  # orange
-                    "Pending": "#6c757d",  # gray
-                }
-                color = color_map.get(name, "#6c757d")
-                return f'<span style="background-color:{color};color:white;padding:2px 8px;border-radius:8px;">{name}</span>'
-
-            for f in flows:
-                flow_id = f.get("id")
-                flow_name = f.get("name")
-                created = str(f.get("created", ""))
-                flow_runs = fetch_flow_runs(api_url, session, flow_id, run_history)
-                with st.expander(f"Flow: {flow_name}"):
-                    st.markdown(f"**Flow ID:** {flow_id}")
-                    st.markdown(f"**Created:** {created}")
-                    if not flow_runs:
-                        st.info("No recent runs found.")
-                    else:
-                        run_table = []
-                        for run in flow_runs:
-                            state = run.get("state", {})
-                            name = state.get("name", "")
-                            timestamp_raw = state.get(
-                                "timestamp", run.get("start_time", "")
-                            )
-                            try:
-                                dt = datetime.fromisoformat(
-                                    timestamp_raw.replace("+00.00", "+00:00")
-                                )
-                                # Convert to local timezone
-                                if dt.tzinfo is None:
-                                    dt = dt.replace(tzinfo=timezone.utc)
-                                local_dt = dt.astimezone()
-                                timestamp_fmt = local_dt.strftime("%d-%m-%Y %H:%M:%S")
-                            except Exception:
-                                timestamp_fmt = timestamp_raw
-                            message = state.get("message", "")
-                            run_table.append(
-                                {
-                                    "State": state_badge(name),
-                                    "Timestamp": timestamp_fmt,
-                                    "Message": message,
-                                }
-                            )
-                        df_table = pd.DataFrame(run_table)
-
-                        def render_table(df):
-                            cols = df.columns.tolist()
-                            html = (
-                                "<table style='width:100%;border-collapse:collapse;'>"
-                            )
-                            html += (
-                                "<tr>"
-                                + "".join(
-                                    [
-                                        f"<th style='border-bottom:1px solid #ddd;padding:6px;text-align:left'>{col}</th>"
-                                        for col in cols
-                                    ]
-                                )
-                                + "</tr>"
-                            )
-                            for _, row in df.iterrows():
-                                html += (
-                                    "<tr>"
-                                    + "".join(
-                                        [
-                                            f"<td style='padding:6px;border-bottom:1px solid #eee'>{row[col] if col != 'State' else row[col]}</td>"
-                                            for col in cols
-                                        ]
-                                    )
-                                    + "</tr>"
-                                )
-                            html += "</table>"
-                            st.markdown(html, unsafe_allow_html=True)
-
-                        render_table(df_table)
+            login = (login_url, username, password)
+            client = get_authenticated_client(*login)
+            try:
+                flows = fetch_flows(api_url, client)
+            except httpx.HTTPStatusError as e:
+                if e.response.status_code != 401:
+                    raise
+                # Session expired or revoked; log in again and retry once
+                client = relogin(client, *login)
+                flows = fetch_flows(api_url, client)
         except Exception as e:
             st.error(f"Error: {e}")
+            return
+
+        render_flows(api_url, login, flows)
 
 
 if __name__ == "__main__":